@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Union
+import json
+
+from models_final import ContentType, WritingContent, ContentEvaluation, ContentRewrite, ContentUsage, BatchUsage, RewriteHistory, CandidateSelection
+
+FILE_EXTENSIONS = {
+    ContentType.EMAIL: ".eml",
+    ContentType.TWEET: ".txt",
+    ContentType.TEXT_MESSAGE: ".txt",
+    ContentType.LINKEDIN_POST: ".md",
+    ContentType.INSTAGRAM_CAPTION: ".txt"
+}
+
+def content_path(output_dir: Path, content_type: ContentType, content_id: str) -> Path:
+    return output_dir / content_type.value / f"{content_id}{FILE_EXTENSIONS[content_type]}"
+
+def rewrite_path(output_dir: Path, content_type: ContentType, content_id: str) -> Path:
+    return output_dir / content_type.value / "rewrites" / f"{content_id}_rewrite{FILE_EXTENSIONS[content_type]}"
+
+def evaluation_path(output_dir: Path, content_type: ContentType, content_id: str) -> Path:
+    return output_dir / "evaluations" / content_type.value / f"{content_id}_evaluation.json"
+
+def usage_path(output_dir: Path, content_type: ContentType, content_id: str) -> Path:
+    return output_dir / "evaluations" / content_type.value / f"{content_id}_usage.json"
+
+def rewrite_history_path(output_dir: Path, content_type: ContentType, content_id: str) -> Path:
+    return output_dir / "evaluations" / content_type.value / f"{content_id}_rewrite_history.json"
+
+def candidates_path(output_dir: Path, content_type: ContentType, content_id: str) -> Path:
+    return output_dir / "evaluations" / content_type.value / f"{content_id}_candidates.json"
+
+def batch_usage_path(output_dir: Path, batch_id: str) -> Path:
+    return output_dir / "evaluations" / "batches" / f"{batch_id}_usage.json"
+
+def render_content(content: WritingContent, topic: str) -> str:
+    text = f"Topic: {topic}\n"
+    text += f"Tone: {content.tone}\n"
+    if content.word_count:
+        text += f"Word count: {content.word_count}\n"
+    text += "\n---\n\n"
+    text += content.content
+    return text
+
+def parse_content(text: str) -> tuple[str, WritingContent]:
+    """Inverse of render_content: the topic and the content with its tone and word count"""
+    header, _, body = text.partition("\n---\n\n")
+    fields = {}
+    for line in header.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip().lower()] = value.strip()
+    word_count = fields.get("word count")
+    return fields.get("topic", ""), WritingContent(
+        content=body,
+        tone=fields.get("tone", ""),
+        word_count=int(word_count) if word_count else None
+    )
+
+def render_rewrite(rewrite: ContentRewrite) -> str:
+    text = "=== Original Content ===\n\n"
+    text += rewrite.original_content
+    text += "\n\n=== Improved Content ===\n\n"
+    text += rewrite.improved_content
+    text += "\n\n=== Changes Made ===\n"
+    for change in rewrite.changes_made:
+        text += f"• {change}\n"
+    text += "\n=== Improvement Focus ===\n"
+    for focus in rewrite.improvement_focus:
+        text += f"• {focus}\n"
+    return text
+
+def render_evaluation(evaluation: ContentEvaluation) -> str:
+    return json.dumps(evaluation.model_dump(), indent=2)
+
+def render_usage(usage: Union[ContentUsage, BatchUsage]) -> str:
+    return json.dumps(usage.model_dump(mode="json"), indent=2)
+
+def render_rewrite_history(history: RewriteHistory) -> str:
+    return json.dumps(history.model_dump(), indent=2)
+
+def render_candidates(selection: CandidateSelection) -> str:
+    return json.dumps(selection.model_dump(), indent=2)
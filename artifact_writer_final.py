@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import Optional, Union, Callable
+import atexit
+import os
+import queue
+import stat
+import tempfile
+import threading
+
+FSYNC_NEVER = "never"
+FSYNC_BATCH = "batch"
+FSYNC_ALWAYS = "always"
+FSYNC_POLICIES = {FSYNC_NEVER, FSYNC_BATCH, FSYNC_ALWAYS}
+
+_STOP = object()
+
+# Read once: os.umask can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def atomic_write_text(path: Path, text: str, fsync: bool = False):
+    """Replace `path` with `text` through a temp file in the same directory and a rename.
+
+    The file keeps the mode of the one it replaces, or gets what a plain open() would give
+    it, instead of mkstemp's owner-only 0600.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), mode)
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class ArtifactWriter:
+    """Background sink for generated content, evaluations and rewrites.
+
+    `write_text` only queues the data, so callers on the event loop never block on disk.
+    A single writer thread drains the queue in batches and writes every file atomically
+    (temp file in the same directory, then rename). Writes to the same path keep their
+    order. Pending writes are flushed on `close()` and at interpreter exit.
+
+    fsync policies: "never" leaves durability to the OS, "batch" fsyncs each file and
+    each touched directory once per batch, "always" fsyncs file and directory per write.
+    """
+
+    def __init__(self, fsync_policy: str = FSYNC_NEVER, batch_size: int = 64, background: bool = True):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.fsync_policy = fsync_policy
+        self.batch_size = batch_size
+        self.background = background
+        self.errors: list[tuple[Union[Path, Callable], Exception]] = []
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._known_dirs: set[Path] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def write_text(self, path: Union[str, Path], text: str):
+        """Queue `text` to be written to `path` and return immediately"""
+        path = Path(path)
+        if not self.background or self._closed:
+            self._write_batch([(path, text)])
+            return
+        self._ensure_thread()
+        self._queue.put((path, text))
+
+    def submit(self, fn: Callable, *args):
+        """Queue any other blocking write (e.g. a results store insert) behind earlier writes"""
+        if not self.background or self._closed:
+            self._write_batch([(fn, args)])
+            return
+        self._ensure_thread()
+        self._queue.put((fn, args))
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch([item for item in batch if item is not _STOP])
+            for _ in batch:
+                self._queue.task_done()
+            if any(item is _STOP for item in batch):
+                return
+
+    def _write_batch(self, items: list[tuple]):
+        touched_dirs = set()
+        for target, payload in items:
+            try:
+                if callable(target):
+                    target(*payload)
+                else:
+                    self._atomic_write(target, payload)
+                    touched_dirs.add(target.parent)
+                self.written += 1
+            except Exception as e:
+                self.errors.append((target, e))
+                print(f"❌ Failed to write {target}: {type(e).__name__}: {e}")
+        if self.fsync_policy == FSYNC_BATCH:
+            for directory in touched_dirs:
+                self._fsync_dir(directory)
+
+    def _atomic_write(self, path: Path, text: str):
+        parent = path.parent
+        if parent not in self._known_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(parent)
+
+        atomic_write_text(path, text, fsync=self.fsync_policy != FSYNC_NEVER)
+        if self.fsync_policy == FSYNC_ALWAYS:
+            self._fsync_dir(parent)
+
+    @staticmethod
+    def _fsync_dir(directory: Path):
+        # Makes the rename durable; not supported on every platform
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def flush(self):
+        """Block until every queued write has reached the filesystem"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread; later writes happen inline"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
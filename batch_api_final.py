@@ -0,0 +1,204 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union, Iterator
+import argparse
+import json
+
+from models_final import ContentType, ContentEvaluation, StoredResult
+from artifact_formats_final import FILE_EXTENSIONS, evaluation_path, parse_content
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# The Batch API accepts at most this many requests per input file
+MAX_REQUESTS_PER_FILE = 50_000
+
+KIND_EVALUATE = "evaluate"
+KIND_REWRITE = "rewrite"
+
+_response_format_params: dict[type, dict] = {}
+
+# custom_ids are derived from the request itself, so re-exporting an unchanged archive gives
+# the same file and results map back to content and aspect without a side table:
+#   evaluate:<content_type>:<content_id>:<aspect>:<prompt version>
+#   rewrite:<content_type>:<content_id>:<prompt version>
+def evaluation_custom_id(content_type: ContentType, content_id: str, aspect: str, version: str) -> str:
+    return f"{KIND_EVALUATE}:{content_type.value}:{content_id}:{aspect}:{version}"
+
+def rewrite_custom_id(content_type: ContentType, content_id: str, version: str) -> str:
+    return f"{KIND_REWRITE}:{content_type.value}:{content_id}:{version}"
+
+def parse_custom_id(custom_id: str) -> dict:
+    """Split a custom_id back into kind, content_type, content_id, aspect and version"""
+    kind, _, rest = custom_id.partition(":")
+    content_type, _, rest = rest.partition(":")
+    try:
+        if kind == KIND_EVALUATE:
+            content_id, aspect, version = rest.rsplit(":", 2)
+        elif kind == KIND_REWRITE:
+            content_id, version = rest.rsplit(":", 1)
+            aspect = None
+        else:
+            raise ValueError(f"unknown request kind {kind!r}")
+        return {
+            "kind": kind,
+            "content_type": ContentType(content_type),
+            "content_id": content_id,
+            "aspect": aspect,
+            "version": version
+        }
+    except ValueError as e:
+        raise ValueError(f"Malformed custom_id {custom_id!r}: {e}") from None
+
+def _response_format_param(response_format: type) -> dict:
+    """The `response_format` body field the SDK sends for a pydantic model, built once per class"""
+    param = _response_format_params.get(response_format)
+    if param is None:
+        from openai.lib._parsing import type_to_response_format_param
+        param = _response_format_params[response_format] = type_to_response_format_param(response_format)
+    return param
+
+def request_line(custom_id: str, request: dict) -> str:
+    """One Batch API input line for a RequestTemplate.request(...) payload"""
+    return json.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": request["model"],
+            "messages": request["messages"],
+            "response_format": _response_format_param(request["response_format"])
+        }
+    })
+
+def parse_result(record: dict, response_format: type):
+    """Parse one Batch API output record into `response_format`, raising ValueError on failure"""
+    error = record.get("error")
+    if error:
+        raise ValueError(error.get("message") or json.dumps(error))
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code") != 200:
+        message = (body.get("error") or {}).get("message", "no error message")
+        raise ValueError(f"HTTP {response.get('status_code')}: {message}")
+    message = body["choices"][0]["message"]
+    if message.get("refusal"):
+        raise ValueError(f"Refused: {message['refusal']}")
+    return response_format.model_validate_json(message["content"])
+
+class BatchRequestFileWriter:
+    """Writes request lines, starting `<stem>.2.jsonl`, `<stem>.3.jsonl`, ... past the per-file limit"""
+
+    def __init__(self, path: Union[str, Path], max_requests: int = MAX_REQUESTS_PER_FILE):
+        self.path = Path(path)
+        self.max_requests = max_requests
+        self.paths: list[Path] = []
+        self.requests = 0
+        self._file = None
+        self._in_file = 0
+
+    def _open_next(self):
+        if self._file is not None:
+            self._file.close()
+        number = len(self.paths) + 1
+        path = self.path if number == 1 else self.path.with_name(f"{self.path.stem}.{number}{self.path.suffix}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self.paths.append(path)
+        self._in_file = 0
+
+    def write(self, line: str):
+        if self._file is None or self._in_file >= self.max_requests:
+            self._open_next()
+        self._file.write(line + "\n")
+        self._in_file += 1
+        self.requests += 1
+
+    def close(self) -> list[Path]:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self.paths
+
+    def __enter__(self) -> "BatchRequestFileWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def iter_batch_results(path: Union[str, Path]) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def iter_archived_results(output_dir: Union[str, Path], content_type: Optional[ContentType] = None) -> Iterator[StoredResult]:
+    """Read saved content and evaluations back from the generated_content/ file layout.
+
+    The tone in each content header stands in for the intended tone. Items are yielded in
+    content_id order per content type, so exports of an unchanged archive are identical.
+    """
+    output_dir = Path(output_dir)
+    for current_type in [content_type] if content_type else list(ContentType):
+        directory = output_dir / current_type.value
+        if not directory.is_dir():
+            continue
+        extension = FILE_EXTENSIONS[current_type]
+        for path in sorted(directory.glob(f"*{extension}")):
+            content_id = path.name[:-len(extension)]
+            topic, content = parse_content(path.read_text(encoding="utf-8"))
+            evaluation_file = evaluation_path(output_dir, current_type, content_id)
+            evaluation = None
+            if evaluation_file.exists():
+                evaluation = ContentEvaluation.model_validate_json(evaluation_file.read_text(encoding="utf-8"))
+            yield StoredResult(
+                content_id=content_id,
+                content_type=current_type,
+                topic=topic,
+                tone=content.tone,
+                created_at=datetime.fromtimestamp(path.stat().st_mtime).isoformat(),
+                content=content,
+                evaluation=evaluation
+            )
+
+if __name__ == "__main__":
+    from content_evaluator_final import ContentEvaluator, EVALUATION_ASPECTS
+    from results_store_final import ResultsStore
+
+    parser = argparse.ArgumentParser(description="Export evaluation requests for the Batch API and ingest its results")
+    parser.add_argument("--dir", default="generated_content", help="Output directory holding the archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write Batch API request JSONL for archived content")
+    export_parser.add_argument("--output", required=True, help="Request file; larger exports continue in numbered files")
+    export_parser.add_argument("--store", help="Read the archive from this SQLite results store instead of the files")
+    export_parser.add_argument("--type", choices=[content_type.value for content_type in ContentType])
+    export_parser.add_argument("--aspects", default=",".join(EVALUATION_ASPECTS), help="Comma-separated aspects to score")
+    export_parser.add_argument("--rewrites", action="store_true",
+                               help="Also request rewrites for items whose saved evaluation fails a gating aspect")
+
+    ingest_parser = subparsers.add_parser("ingest", help="Turn a Batch API results file into saved evaluations")
+    ingest_parser.add_argument("results", help="Batch API output JSONL")
+    ingest_parser.add_argument("--no-merge", action="store_true",
+                               help="Do not fill aspects missing from the results with the saved evaluation's scores")
+    args = parser.parse_args()
+
+    evaluator = ContentEvaluator(Path(args.dir))
+    if args.command == "export":
+        content_type = ContentType(args.type) if args.type else None
+        if args.store:
+            results = (r for r in ResultsStore(args.store).iter_all() if content_type is None or r.content_type == content_type)
+        else:
+            results = iter_archived_results(args.dir, content_type)
+        aspects = [aspect.strip() for aspect in args.aspects.split(",") if aspect.strip()]
+        unknown = set(aspects) - set(EVALUATION_ASPECTS)
+        if unknown:
+            parser.error(f"Unknown aspect(s): {', '.join(sorted(unknown))}")
+        paths = evaluator.export_batch_requests(results, args.output, aspects=aspects, include_rewrites=args.rewrites)
+        print(f"✓ Requests written to: {', '.join(str(path) for path in paths) or 'nothing to export'}")
+    else:
+        ingested = evaluator.ingest_batch_results(args.results, merge=not args.no_merge)
+        evaluator.writer.close()
+        print(f"\n✓ {len(ingested.evaluations)} evaluation(s) and {len(ingested.rewrites)} rewrite(s) saved")
+        for key, error in ingested.errors.items():
+            print(f"❌ {key}: {error}")
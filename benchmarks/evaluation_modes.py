@@ -0,0 +1,113 @@
+"""Compare the fan-out and fused evaluation engines.
+
+For every sample, both modes score the same content with caching disabled. The report
+covers latency, API requests, prompt/completion tokens and how closely the fused scores
+agree with the fan-out scores (per-aspect absolute difference and rewrite decisions).
+
+Usage (from the repository root):
+    python -m benchmarks.evaluation_modes --runs 3 --output evaluation_modes.json
+"""
+from pathlib import Path
+from statistics import mean, median
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from models_final import ContentType, ContentEvaluation
+from content_evaluator_final import (
+    ContentEvaluator,
+    EVALUATION_ASPECTS,
+    GATING_ASPECTS,
+    REWRITE_THRESHOLD,
+    EVALUATION_MODE_FANOUT,
+    EVALUATION_MODE_FUSED
+)
+from llm_client_final import LLMClient
+
+SAMPLES = [
+    (ContentType.TWEET, "casual", "Just shipped our first AI agent in Python. Took 40 lines and a lot of coffee. What should it automate next? #AI #Python"),
+    (ContentType.EMAIL, "professional", "Subject: Q3 roadmap review\n\nHi team,\n\nPlease find the Q3 roadmap attached. Let's review it together on Thursday at 10am and agree on priorities.\n\nBest,\nDana"),
+    (ContentType.TEXT_MESSAGE, "friendly", "Hey! Running 10 min late, grab us a table? 🙏"),
+    (ContentType.LINKEDIN_POST, "professional", "Three lessons from scaling our support team from 5 to 50:\n\n1. Hire for curiosity\n2. Document everything\n3. Measure what customers feel, not what dashboards show\n\nWhat would you add?"),
+    (ContentType.INSTAGRAM_CAPTION, "exciting", "Golden hour on the coast never gets old 🌅 Tag someone you'd watch this with! #sunset #travel #coastlife"),
+]
+
+def _needs_rewrite(evaluation: ContentEvaluation) -> bool:
+    return any(getattr(evaluation, aspect).score < REWRITE_THRESHOLD for aspect in GATING_ASPECTS)
+
+async def _measure(evaluator: ContentEvaluator, client: LLMClient, mode: str, content_type: ContentType, tone: str, content: str) -> dict:
+    before = dict(client.usage_totals)
+    start = time.perf_counter()
+    evaluation = await evaluator.evaluate_content(content, tone, content_type, use_cache=False, mode=mode)
+    elapsed = time.perf_counter() - start
+    return {
+        "latency": elapsed,
+        **{key: client.usage_totals[key] - before[key] for key in before},
+        "evaluation": evaluation
+    }
+
+def _summarize(measurements: list[dict]) -> dict:
+    latencies = sorted(m["latency"] for m in measurements)
+    return {
+        "items": len(measurements),
+        "latency_mean_s": mean(latencies),
+        "latency_p50_s": median(latencies),
+        "latency_max_s": latencies[-1],
+        "requests_per_item": mean(m["requests"] for m in measurements),
+        "prompt_tokens_per_item": mean(m["prompt_tokens"] for m in measurements),
+        "completion_tokens_per_item": mean(m["completion_tokens"] for m in measurements)
+    }
+
+async def run_benchmark(runs: int = 1, client: LLMClient = None) -> dict:
+    client = client or LLMClient()
+    evaluator = ContentEvaluator(Path(tempfile.mkdtemp()), client)
+
+    results = {EVALUATION_MODE_FANOUT: [], EVALUATION_MODE_FUSED: []}
+    diffs = {aspect: [] for aspect in EVALUATION_ASPECTS}
+    decisions_agree = []
+
+    for _ in range(runs):
+        for content_type, tone, content in SAMPLES:
+            fanout = await _measure(evaluator, client, EVALUATION_MODE_FANOUT, content_type, tone, content)
+            fused = await _measure(evaluator, client, EVALUATION_MODE_FUSED, content_type, tone, content)
+            results[EVALUATION_MODE_FANOUT].append(fanout)
+            results[EVALUATION_MODE_FUSED].append(fused)
+            for aspect in EVALUATION_ASPECTS:
+                diffs[aspect].append(abs(
+                    getattr(fanout["evaluation"], aspect).score - getattr(fused["evaluation"], aspect).score
+                ))
+            decisions_agree.append(_needs_rewrite(fanout["evaluation"]) == _needs_rewrite(fused["evaluation"]))
+
+    return {
+        "modes": {mode: _summarize(measurements) for mode, measurements in results.items()},
+        "agreement": {
+            "mean_abs_score_diff": {aspect: mean(values) for aspect, values in diffs.items()},
+            "rewrite_decision_agreement": sum(decisions_agree) / len(decisions_agree)
+        }
+    }
+
+def _print_report(report: dict):
+    print("\n📈 === Evaluation Mode Benchmark ===")
+    for mode, summary in report["modes"].items():
+        print(f"\n{mode}:")
+        print(f"• Latency mean/p50/max: {summary['latency_mean_s']:.2f}s / {summary['latency_p50_s']:.2f}s / {summary['latency_max_s']:.2f}s")
+        print(f"• Requests per item: {summary['requests_per_item']:.1f}")
+        print(f"• Tokens per item: {summary['prompt_tokens_per_item']:.0f} prompt, {summary['completion_tokens_per_item']:.0f} completion")
+    print("\nScore agreement (mean |fanout - fused|):")
+    for aspect, diff in report["agreement"]["mean_abs_score_diff"].items():
+        print(f"• {aspect}: {diff:.2f}")
+    print(f"• Rewrite decision agreement: {report['agreement']['rewrite_decision_agreement']:.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fan-out vs fused evaluation")
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the sample set")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.runs))
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,238 @@
+"""Open-loop load generator with per-stage SLO reporting.
+
+Requests arrive as a Poisson process at a fixed offered rate, regardless of how many
+are still running, and all go through one shared `WritingAssistant` pointed at the
+local stand-in server (`benchmarks.mock_openai_server`). Closed-loop testing waits for
+each response before sending the next request, which hides queueing. An open loop shows
+the point where arrivals outpace service and latency climbs without bound.
+
+For every (arrival rate, admission limit) pair in the sweep the report covers achieved
+throughput, queueing delay (arrival → admission), end-to-end latency, SLO attainment and
+p50/p95/p99 for each stage: generate, every evaluation aspect, rewrite and the save
+calls. The knee is the highest offered rate that still keeps up with arrivals and meets
+the end-to-end SLO at the chosen percentile.
+
+Usage (from the repository root):
+    python -m benchmarks.load_generator --rates 2,5,10,20 --concurrency 8,32 --duration 20 --slo-s 2
+    python -m benchmarks.load_generator --rates 5,10 --score-max 8   # most items need a rewrite
+    python -m benchmarks.load_generator --rates 10,20 --micro-batch 8  # cross-item evaluation batching
+"""
+from collections import defaultdict
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from models_final import ContentType
+from llm_client_final import LLMClient
+from writing_agents_final import WritingAssistant
+from telemetry_final import Telemetry, CallbackSink
+from benchmarks.mock_openai_server import spawn_server
+from benchmarks.offline_suite import percentile
+
+CONTENT_TYPES = list(ContentType)
+
+def _latency_summary(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0, "p50_s": None, "p95_s": None, "p99_s": None}
+    return {
+        "count": len(values),
+        "p50_s": percentile(values, 50),
+        "p95_s": percentile(values, 95),
+        "p99_s": percentile(values, 99)
+    }
+
+def _stage_recorder(stages: dict[str, list[float]]) -> CallbackSink:
+    """Collect span durations by stage, splitting evaluations by aspect and saves by artifact"""
+    def record(span: dict):
+        detail = span.get("aspect") or span.get("artifact")
+        stages[f"{span['stage']}.{detail}" if detail else span["stage"]].append(span["wall_s"])
+    return CallbackSink(record)
+
+async def _run_point(
+    url: str,
+    rate: float,
+    concurrency: int,
+    duration: float,
+    drain_timeout: float,
+    seed: int,
+    micro_batch: int = 1
+) -> dict:
+    stages: dict[str, list[float]] = defaultdict(list)
+    client = LLMClient(
+        base_url=url,
+        api_key="mock",
+        max_connections=max(concurrency * 5, 20),
+        telemetry=Telemetry([_stage_recorder(stages)])
+    )
+    assistant = WritingAssistant(tempfile.mkdtemp(prefix="load-"), client=client, micro_batch_size=micro_batch)
+    await assistant.warm_up(min(concurrency, 5))
+
+    rng = random.Random(seed)
+    admission = asyncio.Semaphore(concurrency)
+    queue_delays: list[float] = []
+    latencies: list[float] = []
+    errors = 0
+    in_flight: set[asyncio.Task] = set()
+
+    async def request(i: int, arrived: float):
+        nonlocal errors
+        async with admission:
+            queue_delays.append(time.perf_counter() - arrived)
+            try:
+                await assistant.generate_content_async(f"load topic {i}", CONTENT_TYPES[i % len(CONTENT_TYPES)], "casual")
+            except Exception:
+                errors += 1
+                return
+        latencies.append(time.perf_counter() - arrived)
+
+    start = time.perf_counter()
+    next_arrival = start
+    sent = 0
+    while True:
+        next_arrival += rng.expovariate(rate)
+        if next_arrival - start >= duration:
+            break
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        task = asyncio.create_task(request(sent, next_arrival))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        sent += 1
+
+    # Requests still queued or running after the arrival window count as unfinished
+    _, pending = await asyncio.wait(in_flight, timeout=drain_timeout) if in_flight else (set(), set())
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await assistant.flush()
+    await client.aclose()
+    assistant.writer.close()
+
+    return {
+        "offered_rate": rate,
+        "concurrency": concurrency,
+        "sent": sent,
+        "completed": len(latencies),
+        "errors": errors,
+        "unfinished": len(pending),
+        "api_requests": client.usage_totals["requests"],
+        "throughput_per_s": len(latencies) / elapsed,
+        "queue_delay": _latency_summary(queue_delays),
+        "end_to_end": _latency_summary(latencies),
+        "stages": {name: _latency_summary(values) for name, values in sorted(stages.items())}
+    }
+
+def _meets_slo(point: dict, slo_s: float, slo_percentile: str) -> bool:
+    latency = point["end_to_end"][slo_percentile]
+    keeps_up = point["completed"] >= 0.95 * point["sent"] and not point["unfinished"]
+    return keeps_up and latency is not None and latency <= slo_s
+
+def find_knees(points: list[dict], slo_s: float, slo_percentile: str = "p99_s") -> dict[int, Optional[float]]:
+    """Highest offered rate per admission limit that keeps up and meets the SLO"""
+    knees: dict[int, Optional[float]] = {}
+    for point in sorted(points, key=lambda p: p["offered_rate"]):
+        knees.setdefault(point["concurrency"], None)
+        if _meets_slo(point, slo_s, slo_percentile):
+            knees[point["concurrency"]] = point["offered_rate"]
+    return knees
+
+def run_sweep(
+    rates: list[float],
+    concurrencies: list[int],
+    duration: float,
+    drain_timeout: float,
+    server_options: dict,
+    seed: int = 0,
+    micro_batch: int = 1
+) -> list[dict]:
+    points = []
+    with spawn_server(**server_options) as url:
+        for concurrency in concurrencies:
+            for rate in rates:
+                print(f"▶ {rate:g} req/s, admission limit {concurrency}...")
+                with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                    points.append(asyncio.run(_run_point(url, rate, concurrency, duration, drain_timeout, seed, micro_batch)))
+    return points
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:.3f}" if value is not None else "-"
+
+def _print_report(points: list[dict], slo_s: float, slo_percentile: str):
+    pct = slo_percentile.removesuffix("_s")
+    for point in points:
+        e2e, queue = point["end_to_end"], point["queue_delay"]
+        status = "✓" if _meets_slo(point, slo_s, slo_percentile) else "✗"
+        print(
+            f"\n{status} {point['offered_rate']:g} req/s @ limit {point['concurrency']}: "
+            f"{point['throughput_per_s']:.2f} done/s, {point['completed']}/{point['sent']} completed, "
+            f"{point['errors']} errors, {point['unfinished']} unfinished, {point['api_requests']} API requests"
+        )
+        print(f"  queue delay   p50 {_fmt(queue['p50_s'])}  p95 {_fmt(queue['p95_s'])}  p99 {_fmt(queue['p99_s'])}")
+        print(f"  end-to-end    p50 {_fmt(e2e['p50_s'])}  p95 {_fmt(e2e['p95_s'])}  p99 {_fmt(e2e['p99_s'])}")
+        for name, stage in point["stages"].items():
+            print(f"  {name:<25} n={stage['count']:<5} p50 {_fmt(stage['p50_s'])}  p95 {_fmt(stage['p95_s'])}  p99 {_fmt(stage['p99_s'])}")
+
+    print(f"\n📈 Throughput knee ({pct} end-to-end ≤ {slo_s:g}s):")
+    for concurrency, knee in find_knees(points, slo_s, slo_percentile).items():
+        print(f"  limit {concurrency}: {f'{knee:g} req/s' if knee is not None else 'no rate met the SLO'}")
+
+def _parse_list(value: str, kind: type) -> list:
+    return [kind(part) for part in value.split(",") if part.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop Poisson load test against a local stand-in server")
+    parser.add_argument("--rates", default="2,5,10,20", help="Comma-separated arrival rates (requests/s)")
+    parser.add_argument("--concurrency", default="8,32", help="Comma-separated admission limits for in-flight requests")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of arrivals per sweep point")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to let outstanding requests finish")
+    parser.add_argument("--slo-s", type=float, default=5.0, help="End-to-end latency objective")
+    parser.add_argument("--slo-percentile", choices=["p50", "p95", "p99"], default="p99")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--score-min", type=float, default=5.0, help="Lower bound of mock scores")
+    parser.add_argument("--score-max", type=float, default=10.0, help="Upper bound of mock scores; lower it to raise the rewrite rate")
+    parser.add_argument("--server-capacity", type=int, help="Requests the stand-in server serves at once")
+    parser.add_argument("--micro-batch", type=int, default=1, help="Evaluation micro-batch size (1 disables batching)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the sweep results as JSON")
+    args = parser.parse_args()
+
+    slo_percentile = f"{args.slo_percentile}_s"
+    points = run_sweep(
+        _parse_list(args.rates, float),
+        _parse_list(args.concurrency, int),
+        args.duration,
+        args.drain_timeout,
+        {
+            "latency_ms": args.latency_ms,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "score_range": (args.score_min, args.score_max),
+            "max_concurrency": args.server_capacity,
+            "seed": args.seed
+        },
+        args.seed,
+        args.micro_batch
+    )
+    _print_report(points, args.slo_s, slo_percentile)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "created_at": datetime.now().isoformat(),
+            "slo_s": args.slo_s,
+            "slo_percentile": args.slo_percentile,
+            "knees": {str(k): v for k, v in find_knees(points, args.slo_s, slo_percentile).items()},
+            "points": points
+        }, indent=2))
+        print(f"💾 Results saved to: {args.output}")
@@ -0,0 +1,334 @@
+"""Local OpenAI-compatible stand-in server for offline benchmarks.
+
+Answers `POST /v1/chat/completions` with a schema-valid structured payload generated
+from the request's `response_format` JSON schema, so `WritingContent`, `EvaluationScore`,
+`ContentRewrite` and any later response model parse without changes. Requests that list
+numbered candidates get one score per candidate, as a compliant model would return. Latency follows a
+log-normal distribution around a median (`jitter` is its sigma), and a configurable share
+of requests fail with 500 or 429 (with a `retry-after-ms` header). `max_concurrency`
+caps how many requests are served at once, so a saturated provider can be modelled.
+`GET /v1/models` answers the connection warm-up.
+
+`fake_batch_results` (or `--batch-input`/`--batch-output`) answers a Batch API request
+file offline, writing an output file in the Batch API results format.
+
+Usage (from the repository root):
+    python -m benchmarks.mock_openai_server --port 8089 --latency-ms 200 --jitter 0.3 --error-rate 0.01
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union, Iterator
+import argparse
+import json
+import math
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+_WORDS = (
+    "clear concise team launch update idea customer product growth insight story plan "
+    "result feedback together simple build learn share today future quality"
+).split()
+
+class _SchemaFaker:
+    """Builds a random instance of a JSON schema as emitted by pydantic for strict outputs"""
+
+    def __init__(self, rng: random.Random, score_range: tuple[float, float]):
+        self.rng = rng
+        self.score_range = score_range
+        # Length of `scores` arrays, set per request from its numbered candidates
+        self.scores_length: Optional[int] = None
+
+    def _text(self, words: int) -> str:
+        return " ".join(self.rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+    def build(self, schema: dict, root: dict, name: str = "") -> object:
+        if "$ref" in schema:
+            return self.build(root["$defs"][schema["$ref"].rsplit("/", 1)[-1]], root, name)
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [option for option in schema[key] if option.get("type") != "null"]
+                return self.build(options[0], root, name)
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+
+        kind = schema.get("type")
+        if kind == "object":
+            return {
+                prop: self.build(prop_schema, root, prop)
+                for prop, prop_schema in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            length = self.scores_length if name == "scores" and self.scores_length else self.rng.randint(1, 3)
+            return [self.build(schema.get("items", {}), root, name) for _ in range(length)]
+        if kind == "number":
+            low, high = self.score_range if name == "score" else (0.0, 1.0)
+            return round(self.rng.uniform(low, high), 1)
+        if kind == "integer":
+            return self.rng.randint(10, 120)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if name in ("content", "improved_content", "original_content"):
+            return " ".join(self._text(12) for _ in range(self.rng.randint(1, 4)))
+        return self._text(self.rng.randint(3, 10))
+
+def _fake_completion(faker: _SchemaFaker, body: dict, completion_id: str) -> dict:
+    """A chat completion with one schema-valid structured payload per requested choice"""
+    json_schema = body["response_format"]["json_schema"]
+    schema = json_schema["schema"]
+    prompt = " ".join(str(message.get("content", "")) for message in body["messages"])
+    faker.scores_length = len(re.findall(r"^Candidate \d+:", prompt, re.MULTILINE))
+    contents = [json.dumps(faker.build(schema, schema)) for _ in range(body.get("n") or 1)]
+    prompt_tokens = math.ceil(len(json.dumps(body["messages"])) / 4)
+    completion_tokens = sum(math.ceil(len(content) / 4) for content in contents)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o"),
+        "choices": [
+            {
+                "index": index,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "finish_reason": "stop",
+                "logprobs": None
+            }
+            for index, content in enumerate(contents)
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+def fake_batch_results(
+    requests_path: Union[str, Path],
+    results_path: Union[str, Path],
+    error_rate: float = 0.0,
+    score_range: tuple[float, float] = (5.0, 10.0),
+    seed: Optional[int] = None
+) -> int:
+    """Answer every line of a Batch API request file, writing a Batch API output file"""
+    rng = random.Random(seed)
+    faker = _SchemaFaker(rng, score_range)
+    answered = 0
+    with open(requests_path, "r", encoding="utf-8") as requests, open(results_path, "w", encoding="utf-8") as results:
+        for number, line in enumerate(requests, 1):
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            record = {"id": f"batch_req_mock_{number}", "custom_id": request["custom_id"], "response": None, "error": None}
+            if rng.random() < error_rate:
+                record["error"] = {"code": "server_error", "message": "Mock batch request failed"}
+            else:
+                record["response"] = {
+                    "status_code": 200,
+                    "request_id": f"req_mock_{number}",
+                    "body": _fake_completion(faker, request["body"], f"chatcmpl-mock-batch-{number}")
+                }
+            results.write(json.dumps(record) + "\n")
+            answered += 1
+    return answered
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connection bursts into 1s SYN retransmits
+    request_queue_size = 1024
+    daemon_threads = True
+
+class MockOpenAIServer:
+    """Threaded HTTP server speaking just enough of the OpenAI API for structured outputs"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 200.0,
+        jitter: float = 0.3,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        score_range: tuple[float, float] = (5.0, 10.0),
+        max_concurrency: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._capacity = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._faker = _SchemaFaker(self._rng, score_range)
+        self.requests = 0
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = _Server((host, port), self._handler_class())
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _delay(self) -> float:
+        with self._lock:
+            sample = self._rng.lognormvariate(0.0, self.jitter) if self.jitter > 0 else 1.0
+        return self.latency_ms / 1000 * sample
+
+    def _outcome(self) -> str:
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.rate_limit_rate:
+            return "rate_limited"
+        return "ok"
+
+    def _completion(self, body: dict) -> dict:
+        with self._lock:
+            return _fake_completion(self._faker, body, f"chatcmpl-mock-{self.requests}")
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, payload: dict, headers: Optional[dict] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._reply(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "mock"}]})
+                else:
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+                if server._capacity is not None:
+                    with server._capacity:
+                        time.sleep(server._delay())
+                else:
+                    time.sleep(server._delay())
+                outcome = server._outcome()
+                if outcome == "error":
+                    self._reply(500, {"error": {"message": "Mock server error", "type": "server_error"}})
+                elif outcome == "rate_limited":
+                    self._reply(
+                        429,
+                        {"error": {"message": "Mock rate limit", "type": "rate_limit_error"}},
+                        {"retry-after-ms": "200"}
+                    )
+                else:
+                    self._reply(200, server._completion(body))
+
+        return Handler
+
+    def start(self) -> "MockOpenAIServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-openai-server", daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+@contextmanager
+def spawn_server(**options) -> Iterator[str]:
+    """Run the stand-in server in a child process and yield its base URL.
+
+    Keeping the server out of the benchmark process means client CPU and allocation
+    measurements do not include the server's own work.
+    """
+    command = [sys.executable, "-m", "benchmarks.mock_openai_server", "--port", "0"]
+    for name, value in options.items():
+        if name == "score_range":
+            command += ["--score-min", str(value[0]), "--score-max", str(value[1])]
+        elif value is not None:
+            command += [f"--{name.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        line = process.stdout.readline()
+        if not line.startswith("listening on "):
+            raise RuntimeError(f"Mock server failed to start: {line!r}")
+        yield line.split("listening on ", 1)[1].strip()
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median response latency")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Log-normal sigma of the latency (0 for fixed)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--score-min", type=float, default=5.0)
+    parser.add_argument("--score-max", type=float, default=10.0)
+    parser.add_argument("--max-concurrency", type=int, help="Requests served at once; the rest wait")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--batch-input", help="Answer this Batch API request file offline instead of serving")
+    parser.add_argument("--batch-output", help="With --batch-input, where to write the Batch API results file")
+    args = parser.parse_args()
+
+    if args.batch_input:
+        if not args.batch_output:
+            parser.error("--batch-input needs --batch-output")
+        answered = fake_batch_results(
+            args.batch_input,
+            args.batch_output,
+            error_rate=args.error_rate,
+            score_range=(args.score_min, args.score_max),
+            seed=args.seed
+        )
+        print(f"✓ Answered {answered} request(s) in {args.batch_output}")
+        sys.exit(0)
+
+    mock = MockOpenAIServer(
+        args.host,
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        score_range=(args.score_min, args.score_max),
+        max_concurrency=args.max_concurrency,
+        seed=args.seed
+    )
+    print(f"listening on {mock.url}", flush=True)
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,248 @@
+"""Offline pipeline benchmarks against the local OpenAI-compatible stand-in server.
+
+Three scenarios run through the real client, agents and writers, with only the API
+replaced by `benchmarks.mock_openai_server` running in a child process:
+
+- `pipeline`: `WritingAssistant.generate_content_async` (generate → evaluate → rewrite → save)
+- `evaluate`: `ContentEvaluator.evaluate_content` with caching disabled
+- `rewrite`: `ContentEvaluator.rewrite_content`
+
+Each scenario reports throughput, p50/p95/p99 latency and client CPU per item from a
+timed pass, then peak and retained traced memory from a shorter pass under tracemalloc.
+Results can be saved as a baseline JSON and later runs compared against it; the
+comparison exits with code 1 when a metric regresses beyond the tolerance.
+
+Usage (from the repository root):
+    python -m benchmarks.offline_suite --items 100 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.offline_suite --items 100 --compare benchmarks/baseline.json
+"""
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from models_final import ContentType, WritingContent, EvaluationScore, ContentEvaluation
+from content_evaluator_final import EVALUATION_ASPECTS
+from llm_client_final import LLMClient
+from writing_agents_final import WritingAssistant
+from benchmarks.mock_openai_server import spawn_server
+
+SCENARIOS = ["pipeline", "evaluate", "rewrite"]
+
+# Metric name → True when higher is better
+COMPARED_METRICS = {
+    "throughput_per_s": True,
+    "latency_p50_s": False,
+    "latency_p95_s": False,
+    "latency_p99_s": False,
+    "cpu_ms_per_item": False,
+    "alloc_peak_kib": False
+}
+
+CONTENT_TYPES = list(ContentType)
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+def _evaluation_fixture() -> ContentEvaluation:
+    score = EvaluationScore(reasoning="Needs a sharper hook.", score=6.5, suggestions=["Lead with the result"])
+    return ContentEvaluation(**{aspect: score for aspect in EVALUATION_ASPECTS}, timestamp=datetime.now().isoformat())
+
+def _scenario_call(name: str, assistant: WritingAssistant) -> Callable[[int], Awaitable]:
+    evaluation = _evaluation_fixture()
+
+    def pipeline(i: int) -> Awaitable:
+        return assistant.generate_content_async(f"benchmark topic {i}", CONTENT_TYPES[i % len(CONTENT_TYPES)], "casual")
+
+    def evaluate(i: int) -> Awaitable:
+        return assistant.evaluator.evaluate_content(
+            f"Benchmark draft number {i} about shipping small, useful tools.",
+            "casual",
+            CONTENT_TYPES[i % len(CONTENT_TYPES)],
+            use_cache=False
+        )
+
+    def rewrite(i: int) -> Awaitable:
+        content = WritingContent(content=f"Benchmark draft number {i}.", tone="casual", word_count=3)
+        return assistant.evaluator.rewrite_content(content, evaluation, CONTENT_TYPES[i % len(CONTENT_TYPES)], use_cache=False)
+
+    return {"pipeline": pipeline, "evaluate": evaluate, "rewrite": rewrite}[name]
+
+async def _drive(assistant: WritingAssistant, scenario: str, items: int, concurrency: int) -> dict:
+    # Import the SDK and open pooled connections before the clock starts
+    await assistant.warm_up(min(concurrency, 5))
+    call = _scenario_call(scenario, assistant)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(items)))
+    await assistant.flush()
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "wall": time.perf_counter() - wall_start,
+        "cpu": time.process_time() - cpu_start
+    }
+
+def _run_pass(url: str, scenario: str, items: int, concurrency: int) -> dict:
+    output_dir = Path(tempfile.mkdtemp(prefix="offline-bench-"))
+    client = LLMClient(base_url=url, api_key="mock", max_connections=max(concurrency * 5, 20))
+    assistant = WritingAssistant(str(output_dir), client=client)
+
+    async def main():
+        try:
+            return await _drive(assistant, scenario, items, concurrency)
+        finally:
+            await client.aclose()
+
+    try:
+        return asyncio.run(main())
+    finally:
+        assistant.writer.close()
+
+def run_scenario(url: str, scenario: str, items: int, concurrency: int, alloc_items: int) -> dict:
+    # Console output is part of the per-item cost, so it is written, just not shown
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        timed = _run_pass(url, scenario, items, concurrency)
+
+        tracemalloc.start()
+        _run_pass(url, scenario, alloc_items, concurrency)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies, wall = timed["latencies"], timed["wall"]
+    completed = len(latencies)
+    return {
+        "items": items,
+        "completed": completed,
+        "errors": timed["errors"],
+        "wall_s": wall,
+        "throughput_per_s": completed / wall if wall else 0.0,
+        "latency_p50_s": percentile(latencies, 50) if latencies else None,
+        "latency_p95_s": percentile(latencies, 95) if latencies else None,
+        "latency_p99_s": percentile(latencies, 99) if latencies else None,
+        "cpu_ms_per_item": timed["cpu"] * 1000 / max(completed, 1),
+        "alloc_items": alloc_items,
+        "alloc_peak_kib": peak / 1024,
+        "alloc_retained_kib_per_item": retained / 1024 / max(alloc_items, 1)
+    }
+
+def run_suite(scenarios: list[str], items: int, concurrency: int, alloc_items: int, server_options: dict) -> dict:
+    results = {}
+    with spawn_server(**server_options) as url:
+        for scenario in scenarios:
+            print(f"▶ {scenario}: {items} items at concurrency {concurrency}...")
+            results[scenario] = run_scenario(url, scenario, items, concurrency, alloc_items)
+    return {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"items": items, "concurrency": concurrency, "alloc_items": alloc_items, **server_options},
+        "scenarios": results
+    }
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return one message per metric that is worse than the baseline by more than `tolerance`"""
+    regressions = []
+    for scenario, metrics in current["scenarios"].items():
+        base = baseline["scenarios"].get(scenario)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            now, before = metrics.get(metric), base.get(metric)
+            if not now or not before:
+                continue
+            change = (now - before) / before
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(f"{scenario}.{metric}: {before:.4g} → {now:.4g} ({change:+.0%})")
+    return regressions
+
+def _print_report(report: dict):
+    header = f"{'scenario':<10} {'items/s':>8} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'cpu ms/item':>12} {'peak KiB':>9} {'errors':>7}"
+    print(f"\n{header}\n{'-' * len(header)}")
+    for scenario, m in report["scenarios"].items():
+        latencies = [f"{m[key]:>7.3f}" if m[key] is not None else f"{'-':>7}" for key in ("latency_p50_s", "latency_p95_s", "latency_p99_s")]
+        print(
+            f"{scenario:<10} {m['throughput_per_s']:>8.1f} {' '.join(latencies)} "
+            f"{m['cpu_ms_per_item']:>12.2f} {m['alloc_peak_kib']:>9.0f} {m['errors']:>7}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline offline against a local stand-in server")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--alloc-items", type=int, default=10, help="Items in the tracemalloc pass")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write this run's results as JSON")
+    parser.add_argument("--save-baseline", help="Write this run's results as the baseline JSON")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression per metric")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    report = run_suite(
+        scenarios,
+        args.items,
+        args.concurrency,
+        args.alloc_items,
+        {
+            "latency_ms": args.latency_ms,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "seed": args.seed
+        }
+    )
+    _print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, indent=2))
+            print(f"💾 Results saved to: {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("config") != report["config"]:
+            print("⚠️ Baseline was recorded with a different configuration")
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"✓ No regressions beyond {args.tolerance:.0%} against {args.compare}")
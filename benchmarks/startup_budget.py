@@ -0,0 +1,90 @@
+"""Enforce the import-time and startup budget of the writing assistant.
+
+Each measurement runs in a fresh interpreter. The check fails (exit code 1) when the
+median import or construction time exceeds its budget, or when importing and
+constructing `WritingAssistant` eagerly loads openai, builds agents or creates
+directories. `python -m pytest` runs the same check with the default budgets, which keeps
+short-lived CLI and serverless invocations fast.
+
+Usage (from the repository root):
+    python -m benchmarks.startup_budget --import-budget-ms 300 --construct-budget-ms 25
+"""
+from pathlib import Path
+from statistics import median
+import argparse
+import json
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Median budgets enforced by default and by tests/test_startup_budget.py
+IMPORT_BUDGET_MS = 300
+CONSTRUCT_BUDGET_MS = 25
+
+_PROBE = """
+import json, sys, tempfile, time
+from pathlib import Path
+start = time.perf_counter()
+import writing_agents_final
+imported = time.perf_counter()
+output_dir = Path(tempfile.mkdtemp()) / "out"
+assistant = writing_agents_final.WritingAssistant(output_dir=str(output_dir))
+constructed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "openai_loaded": "openai" in sys.modules,
+    "agents_built": len(assistant.agents) + len(assistant.evaluator.evaluation_agents),
+    "dirs_created": output_dir.exists()
+}))
+"""
+
+def measure(runs: int = 5) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms": median(sample["import_ms"] for sample in samples),
+        "construct_ms": median(sample["construct_ms"] for sample in samples),
+        "openai_loaded": any(sample["openai_loaded"] for sample in samples),
+        "agents_built": max(sample["agents_built"] for sample in samples),
+        "dirs_created": any(sample["dirs_created"] for sample in samples)
+    }
+
+def check(result: dict, import_budget_ms: float, construct_budget_ms: float) -> list[str]:
+    failures = []
+    if result["import_ms"] > import_budget_ms:
+        failures.append(f"import took {result['import_ms']:.0f}ms (budget {import_budget_ms:.0f}ms)")
+    if result["construct_ms"] > construct_budget_ms:
+        failures.append(f"construction took {result['construct_ms']:.1f}ms (budget {construct_budget_ms:.0f}ms)")
+    if result["openai_loaded"]:
+        failures.append("openai was imported before the first API call")
+    if result["agents_built"]:
+        failures.append(f"{result['agents_built']} agents were built before first use")
+    if result["dirs_created"]:
+        failures.append("output directories were created before the first save")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check import-time and startup budgets")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--construct-budget-ms", type=float, default=CONSTRUCT_BUDGET_MS)
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    print(f"⏱️ Import: {result['import_ms']:.0f}ms, construction: {result['construct_ms']:.1f}ms (median of {args.runs})")
+    failures = check(result, args.import_budget_ms, args.construct_budget_ms)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Startup within budget")
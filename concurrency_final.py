@@ -0,0 +1,115 @@
+from typing import Optional
+import asyncio
+import time
+
+class AdaptiveConcurrencyController:
+    """AIMD limit on in-flight API calls, driven by observed latency and errors.
+
+    While latency stays within `latency_tolerance` of the baseline, the limit grows by
+    roughly one slot per window of completed calls (additive increase). A call that fails
+    or runs slower than the tolerance cuts the limit by `decrease_ratio` (multiplicative
+    decrease), at most once per `cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 1.5,
+        decrease_ratio: float = 0.7,
+        cooldown: float = 2.0,
+        smoothing: float = 0.2
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.decrease_ratio = decrease_ratio
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.baseline_latency: Optional[float] = None
+        self.recent_latency: Optional[float] = None
+        self.completed = 0
+        self.errors = 0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so the controller can be built outside a running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            self.queue_depth += 1
+            try:
+                await condition.wait_for(lambda: self.in_flight < self.limit)
+            finally:
+                self.queue_depth -= 1
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float] = None, error: bool = False):
+        """Free a slot and feed the outcome of the call into the limit"""
+        if latency is not None or error:
+            self._record(latency, error)
+        # Decrement before taking the lock so the count stays right even if this is cancelled
+        self.in_flight -= 1
+        condition = self._get_condition()
+        async with condition:
+            condition.notify_all()
+
+    def _record(self, latency: Optional[float], error: bool):
+        self.completed += 1
+        if error:
+            self.errors += 1
+            self._decrease()
+            return
+
+        if self.recent_latency is None:
+            self.recent_latency = latency
+        else:
+            self.recent_latency += self.smoothing * (latency - self.recent_latency)
+        # The baseline tracks the best latency seen, drifting up slowly so it can recover
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency += 0.01 * (latency - self.baseline_latency)
+
+        if self.recent_latency > self.baseline_latency * self.latency_tolerance:
+            self._decrease()
+        elif self.in_flight >= self.limit:
+            # Only grow when the current limit is actually being used
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.decrease_ratio)
+        # Give the lowered limit a fresh latency window
+        self.recent_latency = self.baseline_latency
+
+    def snapshot(self) -> dict:
+        """Current state for monitoring"""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "baseline_latency_s": self.baseline_latency,
+            "recent_latency_s": self.recent_latency,
+            "completed": self.completed,
+            "errors": self.errors
+        }
@@ -0,0 +1 @@
+# Lets tests import the top-level modules and benchmarks when run with plain `pytest`
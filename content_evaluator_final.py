@@ -1,13 +1,185 @@
-from openai import AsyncOpenAI
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 from pathlib import Path
+from typing import Optional, Union, Callable, Iterable, Any
+import hashlib
 import json
 import asyncio
-from models_final import ContentType, WritingContent, EvaluationScore, ContentEvaluation, ContentRewrite
+import time
+from models_final import (
+    ContentType,
+    WritingContent,
+    EvaluationScore,
+    ContentEvaluation,
+    FusedEvaluation,
+    CandidateScores,
+    ContentRewrite,
+    RewriteIteration,
+    RewriteHistory,
+    StoredResult,
+    BatchIngestResult
+)
+from llm_client_final import LLMClient, get_default_client
+from artifact_writer_final import ArtifactWriter
+from artifact_formats_final import evaluation_path, rewrite_path, render_evaluation, render_rewrite
+from prompt_registry_final import RequestTemplate, PROMPT_REGISTRY
+from telemetry_final import current_span
+from evaluation_batcher_final import EvaluationBatcher
+from platform_rules_final import PlatformCheck, check_platform, fix_platform
+from batch_api_final import (
+    BatchRequestFileWriter,
+    MAX_REQUESTS_PER_FILE,
+    KIND_EVALUATE,
+    evaluation_custom_id,
+    rewrite_custom_id,
+    parse_custom_id,
+    request_line,
+    parse_result,
+    iter_batch_results
+)
+
+EVALUATION_ASPECTS = ["clarity", "engagement", "tone_consistency", "originality", "platform_fit"]
+
+# Aspects that decide whether content gets rewritten, and the score they must reach
+GATING_ASPECTS = ["clarity", "engagement", "tone_consistency"]
+REWRITE_THRESHOLD = 8.0
+
+# Why the rewrite loop stopped
+REWRITE_STOP_CONVERGED = "converged"
+REWRITE_STOP_MAX_ITERATIONS = "max_iterations"
+REWRITE_STOP_TIME_BUDGET = "time_budget"
+
+def failing_aspects(evaluation: ContentEvaluation, aspects: list[str] = GATING_ASPECTS) -> list[str]:
+    """Scored aspects among `aspects` that are below REWRITE_THRESHOLD"""
+    return [
+        aspect for aspect in aspects
+        if (score := getattr(evaluation, aspect)) is not None and score.score < REWRITE_THRESHOLD
+    ]
+
+def unscored_aspects(evaluation: ContentEvaluation) -> list[str]:
+    """Aspects of EVALUATION_ASPECTS that `evaluation` has no score for"""
+    return [aspect for aspect in EVALUATION_ASPECTS if getattr(evaluation, aspect) is None]
+
+# Equal weight per aspect when picking the best of several candidates
+DEFAULT_SELECTION_WEIGHTS = dict.fromkeys(EVALUATION_ASPECTS, 1.0)
+
+def weighted_score(evaluation: ContentEvaluation, weights: dict[str, float] = DEFAULT_SELECTION_WEIGHTS) -> float:
+    """Weighted mean of the scored aspects; unscored aspects drop out of the weights"""
+    total = weight_sum = 0.0
+    for aspect, weight in weights.items():
+        score = getattr(evaluation, aspect)
+        if score is not None:
+            total += weight * score.score
+            weight_sum += weight
+    return total / weight_sum if weight_sum else 0.0
+
+def _scores(evaluation: ContentEvaluation) -> dict[str, float]:
+    return {
+        aspect: score.score
+        for aspect in EVALUATION_ASPECTS
+        if (score := getattr(evaluation, aspect)) is not None
+    }
+
+# Evaluation engines: one call per aspect, or all five aspects in a single structured call
+EVALUATION_MODE_FANOUT = "fanout"
+EVALUATION_MODE_FUSED = "fused"
+EVALUATION_MODES = {EVALUATION_MODE_FANOUT, EVALUATION_MODE_FUSED}
+
+# Aspects whose prompt includes the intended tone; every other aspect scores the content alone
+TONE_DEPENDENT_ASPECTS = {"tone_consistency"}
+
+class AspectEvaluationCache:
+    """In-memory LRU of aspect scores keyed by content hash, content type and aspect.
+
+    The intended tone is only part of the key for tone-dependent aspects, so re-evaluating
+    the same copy under a different tone re-runs just those aspects.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, EvaluationScore] = OrderedDict()
+
+    @staticmethod
+    def make_key(aspect: str, content: str, intended_tone: str, content_type: ContentType) -> tuple:
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        tone = intended_tone.strip().lower() if aspect in TONE_DEPENDENT_ASPECTS else None
+        return (content_hash, content_type.value, aspect, tone)
+
+    def get(self, key: tuple) -> Optional[EvaluationScore]:
+        score = self._entries.get(key)
+        if score is not None:
+            self._entries.move_to_end(key)
+        return score
+
+    def put(self, key: tuple, score: EvaluationScore):
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class LazyAgentMap(dict):
+    """Agents per content type, each constructed the first time it is looked up"""
+
+    def __init__(self, build: Callable[[ContentType], Any]):
+        super().__init__()
+        self._build = build
+
+    def __missing__(self, content_type: ContentType):
+        agent = self[content_type] = self._build(content_type)
+        return agent
 
 class BaseEvaluationAgent:
-    def __init__(self):
-        self.client = AsyncOpenAI()
+    def __init__(self, client: Optional[LLMClient] = None):
+        self.client = client or get_default_client()
+        self._templates: Optional[dict[str, RequestTemplate]] = None
+        self._candidate_templates: Optional[dict[str, RequestTemplate]] = None
+
+    @property
+    def templates(self) -> dict[str, RequestTemplate]:
+        """Per-aspect and fused request templates, compiled once per agent"""
+        if self._templates is None:
+            name = type(self).__name__
+            templates = {
+                aspect: RequestTemplate(
+                    (name, aspect),
+                    getattr(self, f"{aspect}_prompt"),
+                    "Content: {content}\nIntended Tone: {intended_tone}" if aspect in TONE_DEPENDENT_ASPECTS else "Content: {content}",
+                    EvaluationScore
+                )
+                for aspect in EVALUATION_ASPECTS
+            }
+            templates["fused"] = RequestTemplate(
+                (name, "fused"),
+                self.fused_prompt,
+                "Content: {content}\nIntended Tone: {intended_tone}",
+                FusedEvaluation
+            )
+            self._templates = {key: PROMPT_REGISTRY.register(template) for key, template in templates.items()}
+        return self._templates
+
+    @property
+    def candidate_templates(self) -> dict[str, RequestTemplate]:
+        """Per-aspect templates that score several numbered candidates in one call"""
+        if self._candidate_templates is None:
+            name = type(self).__name__
+            self._candidate_templates = {
+                aspect: PROMPT_REGISTRY.register(RequestTemplate(
+                    (name, aspect, "candidates"),
+                    getattr(self, f"{aspect}_prompt")
+                    + "\n\nScore each numbered candidate on its own merits. Return exactly one score per candidate, in the order given.",
+                    "Candidates:\n\n{candidates}\n\nIntended Tone: {intended_tone}" if aspect in TONE_DEPENDENT_ASPECTS else "Candidates:\n\n{candidates}",
+                    CandidateScores
+                ))
+                for aspect in EVALUATION_ASPECTS
+            }
+        return self._candidate_templates
+
+    def prompt_versions(self, aspects: list[str], candidates: bool = False) -> dict[str, str]:
+        templates = self.candidate_templates if candidates else self.templates
+        return {aspect: templates[aspect].version for aspect in aspects}
         
     @property
     def clarity_prompt(self) -> str:
@@ -29,30 +201,67 @@ class BaseEvaluationAgent:
     def platform_fit_prompt(self) -> str:
         raise NotImplementedError
 
-    async def evaluate_aspect(self, aspect: str, content: str, intended_tone: str) -> EvaluationScore:
-        prompts = {
-            "clarity": self.clarity_prompt,
-            "engagement": self.engagement_prompt,
-            "tone_consistency": self.tone_consistency_prompt,
-            "originality": self.originality_prompt,
-            "platform_fit": self.platform_fit_prompt
-        }
-        
-        messages = [
-            {"role": "system", "content": prompts[aspect]},
-            {"role": "user", "content": f"Content: {content}"}
-        ]
-        
-        if aspect == "tone_consistency":
-            messages[1]["content"] += f"\nIntended Tone: {intended_tone}"
+    async def evaluate_aspect(
+        self,
+        aspect: str,
+        content: str,
+        intended_tone: str,
+        use_cache: Optional[bool] = None
+    ) -> EvaluationScore:
+        template = self.templates[aspect]
+        return await self.client.structured(
+            **template.request(content=content, intended_tone=intended_tone),
+            use_cache=use_cache
+        )
+
+    async def evaluate_aspect_candidates(
+        self,
+        aspect: str,
+        contents: list[str],
+        intended_tone: str,
+        use_cache: Optional[bool] = None
+    ) -> list[EvaluationScore]:
+        """Score one aspect of several candidates in one call.
 
-        completion = await self.client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=messages,
-            response_format=EvaluationScore
+        If the model returns a different number of scores than candidates, the scores cannot
+        be matched up, and each candidate is scored with its own call instead.
+        """
+        template = self.candidate_templates[aspect]
+        candidates = "\n\n".join(f"Candidate {i}:\n{content}" for i, content in enumerate(contents, 1))
+        result = await self.client.structured(
+            **template.request(candidates=candidates, intended_tone=intended_tone),
+            use_cache=use_cache
+        )
+        if len(result.scores) == len(contents):
+            return result.scores
+        print(f"⚠️ Got {len(result.scores)} {aspect.replace('_', ' ')} scores for {len(contents)} candidates, scoring them one by one")
+        return list(await asyncio.gather(*(
+            self.evaluate_aspect(aspect, content, intended_tone, use_cache) for content in contents
+        )))
+
+    @property
+    def fused_prompt(self) -> str:
+        sections = "\n\n".join(
+            f"## {aspect.replace('_', ' ').title()}\n{getattr(self, f'{aspect}_prompt')}"
+            for aspect in EVALUATION_ASPECTS
+        )
+        return f"""Evaluate the content on each of the following aspects independently.
+Give every aspect its own reasoning, a score from 0 to 10 and concrete suggestions.
+
+{sections}"""
+
+    async def evaluate_all(
+        self,
+        content: str,
+        intended_tone: str,
+        use_cache: Optional[bool] = None
+    ) -> FusedEvaluation:
+        """Score all aspects in one structured call instead of one call per aspect"""
+        template = self.templates["fused"]
+        return await self.client.structured(
+            **template.request(content=content, intended_tone=intended_tone),
+            use_cache=use_cache
         )
-        
-        return completion.choices[0].message.parsed
 
 class TweetEvaluationAgent(BaseEvaluationAgent):
     @property
@@ -259,106 +468,606 @@ class InstagramEvaluationAgent(BaseEvaluationAgent):
 - Does it follow platform best practices?
 - Would it perform well in the Instagram environment?"""
 
+EVALUATION_AGENT_CLASSES = {
+    ContentType.TWEET: TweetEvaluationAgent,
+    ContentType.EMAIL: EmailEvaluationAgent,
+    ContentType.TEXT_MESSAGE: TextMessageEvaluationAgent,
+    ContentType.LINKEDIN_POST: LinkedInEvaluationAgent,
+    ContentType.INSTAGRAM_CAPTION: InstagramEvaluationAgent
+}
+
+REWRITE_TEMPLATE = PROMPT_REGISTRY.register(RequestTemplate(
+    ("rewrite",),
+    "You are improving content based on specific evaluation feedback.",
+    """
+Original Content: {content}
+Tone: {tone}
+Content Type: {content_type}
+
+Evaluation Feedback:
+{feedback}
+
+Please rewrite the content addressing the evaluation feedback while maintaining the original intent and tone.
+""",
+    ContentRewrite
+))
+
 class ContentEvaluator:
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        client: Optional[LLMClient] = None,
+        aspect_cache: Optional[AspectEvaluationCache] = None,
+        evaluation_mode: Union[str, dict[ContentType, str]] = EVALUATION_MODE_FANOUT,
+        writer: Optional[ArtifactWriter] = None,
+        micro_batch_size: int = 1,
+        micro_batch_window_s: float = 0.02,
+        precheck: bool = False
+    ):
+        # Directories are created by the writer when the first evaluation is saved
         self.eval_dir = output_dir / "evaluations"
-        self.eval_dir.mkdir(exist_ok=True)
         
-        # Add client initialization
-        self.client = AsyncOpenAI()
+        # Evaluation files are queued to a background writer instead of written on the event loop
+        self.writer = writer or ArtifactWriter()
+        
+        # Shared pooled client, also used by every evaluation agent
+        self.client = client or get_default_client()
+        
+        # Aspect-level memo so identical content is not re-scored
+        self.aspect_cache = aspect_cache if aspect_cache is not None else AspectEvaluationCache()
         
-        # Initialize specialized evaluation agents
-        self.evaluation_agents = {
-            ContentType.TWEET: TweetEvaluationAgent(),
-            ContentType.EMAIL: EmailEvaluationAgent(),
-            ContentType.TEXT_MESSAGE: TextMessageEvaluationAgent(),
-            ContentType.LINKEDIN_POST: LinkedInEvaluationAgent(),
-            ContentType.INSTAGRAM_CAPTION: InstagramEvaluationAgent()
+        # Evaluation engine per content type, either one mode for all or a per-type mapping
+        if isinstance(evaluation_mode, str):
+            evaluation_mode = {content_type: evaluation_mode for content_type in ContentType}
+        self.evaluation_modes = {
+            content_type: evaluation_mode.get(content_type, EVALUATION_MODE_FANOUT)
+            for content_type in ContentType
         }
-
-    async def _evaluate_aspect(self, aspect: str, content: str, intended_tone: str, content_type: ContentType) -> EvaluationScore:
-        print(f"🔍 Evaluating {aspect.replace('_', ' ')}...")
+        unknown = set(self.evaluation_modes.values()) - EVALUATION_MODES
+        if unknown:
+            raise ValueError(f"Unknown evaluation mode(s): {', '.join(sorted(unknown))}")
+        
+        # Specialized evaluation agents, built on first use per content type
+        self.evaluation_agents = LazyAgentMap(
+            lambda content_type: EVALUATION_AGENT_CLASSES[content_type](self.client)
+        )
+        
+        # Concurrent fanout requests for the same aspect and content type share one call
+        self.batcher = None
+        if micro_batch_size > 1:
+            self.batcher = EvaluationBatcher(
+                self._evaluate_many,
+                window_s=micro_batch_window_s,
+                max_batch=micro_batch_size,
+                tone_dependent=frozenset(TONE_DEPENDENT_ASPECTS)
+            )
         
-        # Get the appropriate evaluation agent
+        # Local platform rules run before the LLM; a hard failure replaces the platform_fit call
+        self.precheck = precheck
+
+    def check_constraints(self, content: str, content_type: ContentType) -> PlatformCheck:
+        """Check the content against its platform's hard limits, locally and deterministically"""
+        with self.client.telemetry.span("precheck", content_type=content_type.value):
+            return check_platform(content, content_type)
+
+    def _failed_precheck(self, content: str, content_type: ContentType, aspects: list[str]) -> Optional[PlatformCheck]:
+        """The failed platform check that stands in for the platform_fit call, if there is one"""
+        if not self.precheck or "platform_fit" not in aspects:
+            return None
+        check = self.check_constraints(content, content_type)
+        return None if check.passed else check
+
+    @staticmethod
+    def _with_rule_score(evaluation: ContentEvaluation, failed: Optional[PlatformCheck]) -> ContentEvaluation:
+        if failed is None:
+            return evaluation
+        return evaluation.model_copy(update={
+            "platform_fit": failed.to_score(),
+            "prompt_versions": {**(evaluation.prompt_versions or {}), "platform_fit": failed.version}
+        })
+
+    def fix_up(self, original_content: WritingContent, content_type: ContentType) -> Optional[ContentRewrite]:
+        """Repair broken platform rules locally, or None when only a real rewrite can fix them"""
+        with self.client.telemetry.span("fixup", content_type=content_type.value):
+            if check_platform(original_content.content, content_type).passed:
+                return None
+            fixed, changes = fix_platform(original_content.content, content_type)
+            if not changes or not check_platform(fixed, content_type).passed:
+                return None
+        print(f"🔧 Fixed platform constraints locally: {'; '.join(changes)}")
+        return ContentRewrite(
+            original_content=original_content.content,
+            improved_content=fixed,
+            changes_made=changes,
+            improvement_focus=["platform_fit"]
+        )
+
+    def rules_evaluation(self, check: PlatformCheck) -> ContentEvaluation:
+        """An evaluation holding only the rule-based platform_fit score of a failed check"""
+        return self._with_rule_score(ContentEvaluation(timestamp=datetime.now().isoformat()), check)
+
+    def aspects_to_improve(self, content: str, content_type: ContentType, evaluation: ContentEvaluation) -> list[str]:
+        """What a rewrite of `content` still has to fix.
+
+        Gating aspects that fail or were never scored, plus platform_fit while the content
+        breaks a hard platform rule.
+        """
+        failing = failing_aspects(evaluation)
+        aspects = [aspect for aspect in GATING_ASPECTS if aspect in failing or getattr(evaluation, aspect) is None]
+        if self._failed_precheck(content, content_type, ["platform_fit"]) is not None:
+            aspects.append("platform_fit")
+        return aspects
+
+    async def _evaluate_many(
+        self,
+        content_type: ContentType,
+        aspect: str,
+        contents: list[str],
+        intended_tone: str,
+        use_cache: Optional[bool] = None
+    ) -> list[EvaluationScore]:
         agent = self.evaluation_agents[content_type]
-        return await agent.evaluate_aspect(aspect, content, intended_tone)
+        if len(contents) == 1:
+            return [await agent.evaluate_aspect(aspect, contents[0], intended_tone, use_cache)]
+        return await agent.evaluate_aspect_candidates(aspect, contents, intended_tone, use_cache)
+
+    async def _evaluate_aspect(
+        self,
+        aspect: str,
+        content: str,
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None
+    ) -> EvaluationScore:
+        with self.client.telemetry.span("evaluate", content_type=content_type.value, aspect=aspect):
+            key = AspectEvaluationCache.make_key(aspect, content, intended_tone, content_type)
+            if use_cache is not False:
+                cached = self.aspect_cache.get(key)
+                if cached is not None:
+                    print(f"✓ Reusing {aspect.replace('_', ' ')} score for identical content")
+                    span = current_span()
+                    if span is not None:
+                        span.cache_hits += 1
+                    return cached
+            
+            print(f"🔍 Evaluating {aspect.replace('_', ' ')}...")
+            
+            if self.batcher is not None:
+                score = await self.batcher.evaluate(aspect, content, intended_tone, content_type, use_cache)
+            else:
+                # Get the appropriate evaluation agent
+                agent = self.evaluation_agents[content_type]
+                score = await agent.evaluate_aspect(aspect, content, intended_tone, use_cache)
+            if use_cache is not False:
+                self.aspect_cache.put(key, score)
+            return score
+
+    async def evaluate_content(
+        self,
+        content: str,
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None,
+        mode: Optional[str] = None,
+        aspects: Optional[list[str]] = None
+    ) -> ContentEvaluation:
+        """Score the content; in fanout mode `aspects` limits which aspects are requested.
 
-    async def evaluate_content(self, content: str, intended_tone: str, content_type: ContentType) -> ContentEvaluation:
+        Aspects left out stay None, so the list must include GATING_ASPECTS. Fused mode
+        always scores every aspect in its one call.
+        """
+        mode = mode or self.evaluation_modes[content_type]
+        if mode == EVALUATION_MODE_FUSED:
+            return await self._evaluate_content_fused(content, intended_tone, content_type, use_cache)
+        if mode != EVALUATION_MODE_FANOUT:
+            raise ValueError(f"Unknown evaluation mode: {mode}")
+        aspects = aspects or EVALUATION_ASPECTS
+        failed = self._failed_precheck(content, content_type, aspects)
+        if failed is not None:
+            print("📏 Platform rules failed, skipping the platform fit call")
+            aspects = [aspect for aspect in aspects if aspect != "platform_fit"]
+        
         print("\n📊 Starting parallel content evaluation...")
         
         tasks = {
-            aspect: asyncio.create_task(self._evaluate_aspect(aspect, content, intended_tone, content_type))
-            for aspect in ["clarity", "engagement", "tone_consistency", "originality", "platform_fit"]
+            aspect: asyncio.create_task(self._evaluate_aspect(aspect, content, intended_tone, content_type, use_cache))
+            for aspect in aspects
         }
         
         results = await asyncio.gather(*tasks.values())
         evaluations = dict(zip(tasks.keys(), results))
         
-        return ContentEvaluation(
+        return self._with_rule_score(ContentEvaluation(
             **evaluations,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            prompt_versions=self.evaluation_agents[content_type].prompt_versions(aspects)
+        ), failed)
+
+    async def _evaluate_aspect_candidates(
+        self,
+        aspect: str,
+        contents: list[str],
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None
+    ) -> list[EvaluationScore]:
+        with self.client.telemetry.span("evaluate", content_type=content_type.value, aspect=aspect):
+            keys = [AspectEvaluationCache.make_key(aspect, content, intended_tone, content_type) for content in contents]
+            scores = [self.aspect_cache.get(key) if use_cache is not False else None for key in keys]
+            missing = [i for i, score in enumerate(scores) if score is None]
+            span = current_span()
+            if span is not None:
+                span.cache_hits += len(contents) - len(missing)
+            if not missing:
+                return scores
+            
+            print(f"🔍 Evaluating {aspect.replace('_', ' ')} for {len(missing)} candidate(s)...")
+            agent = self.evaluation_agents[content_type]
+            if len(missing) == 1:
+                fresh = [await agent.evaluate_aspect(aspect, contents[missing[0]], intended_tone, use_cache)]
+            else:
+                fresh = await agent.evaluate_aspect_candidates(aspect, [contents[i] for i in missing], intended_tone, use_cache)
+            for i, score in zip(missing, fresh):
+                scores[i] = score
+                if use_cache is not False:
+                    self.aspect_cache.put(keys[i], score)
+            return scores
+
+    async def evaluate_candidates(
+        self,
+        contents: list[str],
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None,
+        aspects: Optional[list[str]] = None
+    ) -> list[ContentEvaluation]:
+        """Score several candidates with one call per aspect, returning one evaluation per candidate.
+
+        Candidates already in the aspect cache are left out of the call; a single remaining
+        candidate is scored with the regular per-aspect prompt.
+        """
+        aspects = aspects or EVALUATION_ASPECTS
+        print(f"\n📊 Scoring {len(contents)} candidates together...")
+        
+        # Candidates that break a platform rule get the rule score instead of a platform_fit slot in the call
+        failed = [self._failed_precheck(content, content_type, aspects) for content in contents]
+        scored = {
+            aspect: [i for i in range(len(contents)) if aspect != "platform_fit" or failed[i] is None]
+            for aspect in aspects
+        }
+        per_aspect = await asyncio.gather(*(
+            self._evaluate_aspect_candidates(aspect, [contents[i] for i in scored[aspect]], intended_tone, content_type, use_cache)
+            for aspect in aspects
+        ))
+        by_index = {aspect: dict(zip(scored[aspect], scores)) for aspect, scores in zip(aspects, per_aspect)}
+        prompt_versions = self.evaluation_agents[content_type].prompt_versions(aspects, candidates=len(contents) > 1)
+        timestamp = datetime.now().isoformat()
+        return [
+            self._with_rule_score(ContentEvaluation(
+                **{aspect: by_index[aspect].get(i) for aspect in aspects},
+                timestamp=timestamp,
+                prompt_versions=prompt_versions
+            ), failed[i])
+            for i in range(len(contents))
+        ]
+
+    async def evaluate_gating_first(
+        self,
+        content: str,
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None
+    ) -> tuple[ContentEvaluation, asyncio.Task]:
+        """Return as soon as the gating aspects are scored.
+
+        All aspects start in parallel. The returned evaluation holds only the gating aspects;
+        the returned task resolves to the complete evaluation once the rest finish.
+        """
+        print("\n📊 Starting gating-first content evaluation...")
+        
+        failed = self._failed_precheck(content, content_type, EVALUATION_ASPECTS)
+        aspects = [aspect for aspect in EVALUATION_ASPECTS if failed is None or aspect != "platform_fit"]
+        tasks = {
+            aspect: asyncio.create_task(self._evaluate_aspect(aspect, content, intended_tone, content_type, use_cache))
+            for aspect in aspects
+        }
+        try:
+            gating_scores = await asyncio.gather(*(tasks[aspect] for aspect in GATING_ASPECTS))
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        
+        agent = self.evaluation_agents[content_type]
+        partial = ContentEvaluation(
+            **dict(zip(GATING_ASPECTS, gating_scores)),
+            timestamp=datetime.now().isoformat(),
+            prompt_versions=agent.prompt_versions(GATING_ASPECTS)
         )
+        
+        async def complete() -> ContentEvaluation:
+            remaining = [aspect for aspect in aspects if aspect not in GATING_ASPECTS]
+            scores = await asyncio.gather(*(tasks[aspect] for aspect in remaining))
+            return self._with_rule_score(partial.model_copy(update={
+                **dict(zip(remaining, scores)),
+                "prompt_versions": agent.prompt_versions(aspects)
+            }), failed)
+        
+        return partial, asyncio.create_task(complete())
+
+    async def reevaluate_aspects(
+        self,
+        content: str,
+        intended_tone: str,
+        content_type: ContentType,
+        previous: ContentEvaluation,
+        aspects: list[str],
+        use_cache: Optional[bool] = None
+    ) -> ContentEvaluation:
+        """Score `aspects` of new content and carry every other score over from `previous`"""
+        failed = self._failed_precheck(content, content_type, aspects)
+        if failed is not None:
+            aspects = [aspect for aspect in aspects if aspect != "platform_fit"]
+        scores = await asyncio.gather(*(
+            self._evaluate_aspect(aspect, content, intended_tone, content_type, use_cache)
+            for aspect in aspects
+        ))
+        return self._with_rule_score(previous.model_copy(update={
+            **dict(zip(aspects, scores)),
+            "timestamp": datetime.now().isoformat(),
+            "prompt_versions": {
+                **(previous.prompt_versions or {}),
+                **self.evaluation_agents[content_type].prompt_versions(aspects)
+            }
+        }), failed)
+
+    async def improve_content(
+        self,
+        original_content: WritingContent,
+        evaluation: ContentEvaluation,
+        content_type: ContentType,
+        intended_tone: str,
+        max_iterations: int = 3,
+        time_budget_s: Optional[float] = None,
+        use_cache: Optional[bool] = None
+    ) -> tuple[ContentRewrite, RewriteHistory, ContentEvaluation]:
+        """Rewrite until every gating aspect passes, or the iteration or time budget runs out.
+
+        Returns the rewrite, its history and the evaluation of the final draft.
+
+        After each rewrite only the gating aspects that were still failing (or unscored) are
+        scored again, with platform_fit while a precheck rule is broken; passing scores carry
+        over. No new round starts when the average round time would take the loop past
+        `time_budget_s`. With precheck on, a round where no scored gating aspect fails tries
+        the local fix-up first and calls the LLM only if the rules can't be repaired locally.
+        """
+        if max_iterations < 1:
+            raise ValueError("max_iterations must be at least 1")
+        start = time.perf_counter()
+        current = original_content
+        rewrites: list[ContentRewrite] = []
+        history = RewriteHistory(
+            initial_scores=_scores(evaluation),
+            iterations=[],
+            converged=False,
+            stop_reason=REWRITE_STOP_MAX_ITERATIONS
+        )
+        
+        for iteration in range(1, max_iterations + 1):
+            failing = self.aspects_to_improve(current.content, content_type, evaluation)
+            rewrite = None
+            if self.precheck and not failing_aspects(evaluation):
+                rewrite = self.fix_up(current, content_type)
+            local = rewrite is not None
+            if not local:
+                rewrite = await self.rewrite_content(current, evaluation, content_type, use_cache)
+            rewrites.append(rewrite)
+            
+            print(f"🔁 Re-evaluating {', '.join(aspect.replace('_', ' ') for aspect in failing)} after rewrite {iteration}...")
+            evaluation = await self.reevaluate_aspects(
+                rewrite.improved_content, intended_tone, content_type, evaluation, failing, use_cache
+            )
+            current = WritingContent(
+                content=rewrite.improved_content,
+                tone=current.tone,
+                word_count=len(rewrite.improved_content.split())
+            )
+            
+            elapsed = time.perf_counter() - start
+            passed = not self.aspects_to_improve(current.content, content_type, evaluation)
+            history.iterations.append(RewriteIteration(
+                iteration=iteration,
+                improved_content=rewrite.improved_content,
+                scores=_scores(evaluation),
+                reevaluated=failing,
+                passed=passed,
+                elapsed_s=elapsed,
+                local=local
+            ))
+            if passed:
+                history.converged = True
+                history.stop_reason = REWRITE_STOP_CONVERGED
+                break
+            if time_budget_s is not None and iteration < max_iterations and elapsed * (iteration + 1) / iteration > time_budget_s:
+                history.stop_reason = REWRITE_STOP_TIME_BUDGET
+                break
+        
+        print(f"✓ Rewrite loop {history.stop_reason.replace('_', ' ')} after {len(history.iterations)} round(s)")
+        if len(rewrites) == 1:
+            return rewrites[0], history, evaluation
+        return ContentRewrite(
+            original_content=rewrites[0].original_content,
+            improved_content=rewrites[-1].improved_content,
+            changes_made=[change for rewrite in rewrites for change in rewrite.changes_made],
+            improvement_focus=list(dict.fromkeys(focus for rewrite in rewrites for focus in rewrite.improvement_focus))
+        ), history, evaluation
+
+    async def _evaluate_content_fused(
+        self,
+        content: str,
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None
+    ) -> ContentEvaluation:
+        keys = {
+            aspect: AspectEvaluationCache.make_key(aspect, content, intended_tone, content_type)
+            for aspect in EVALUATION_ASPECTS
+        }
+        evaluations = {}
+        if use_cache is not False:
+            evaluations = {aspect: self.aspect_cache.get(key) for aspect, key in keys.items()}
+        
+        agent = self.evaluation_agents[content_type]
+        if not all(evaluations.get(aspect) for aspect in EVALUATION_ASPECTS):
+            print("\n📊 Starting fused content evaluation...")
+            with self.client.telemetry.span("evaluate", content_type=content_type.value, aspect="fused"):
+                fused = await agent.evaluate_all(content, intended_tone, use_cache)
+            evaluations = {aspect: getattr(fused, aspect) for aspect in EVALUATION_ASPECTS}
+            if use_cache is not False:
+                for aspect, key in keys.items():
+                    self.aspect_cache.put(key, evaluations[aspect])
+        else:
+            print("✓ Reusing all aspect scores for identical content")
+        
+        fused_version = agent.templates["fused"].version
+        return self._with_rule_score(ContentEvaluation(
+            **evaluations,
+            timestamp=datetime.now().isoformat(),
+            prompt_versions={aspect: fused_version for aspect in EVALUATION_ASPECTS}
+        ), self._failed_precheck(content, content_type, EVALUATION_ASPECTS))
 
     async def rewrite_content(
         self,
         original_content: WritingContent,
         evaluation: ContentEvaluation,
-        content_type: ContentType
+        content_type: ContentType,
+        use_cache: Optional[bool] = None
     ) -> ContentRewrite:
         print("\n✏️ Generating content rewrite based on evaluation...")
-        
+        with self.client.telemetry.span("rewrite", content_type=content_type.value):
+            return await self.client.structured(
+                **self._rewrite_request(original_content, evaluation, content_type),
+                use_cache=use_cache
+            )
+
+    @staticmethod
+    def _rewrite_request(original_content: WritingContent, evaluation: ContentEvaluation, content_type: ContentType) -> dict:
+        # Aspects still pending from a gating-first evaluation are left out of the feedback
         eval_summary = {
-            "clarity": {
-                "score": evaluation.clarity.score,
-                "suggestions": evaluation.clarity.suggestions
-            },
-            "engagement": {
-                "score": evaluation.engagement.score,
-                "suggestions": evaluation.engagement.suggestions
-            },
-            "tone_consistency": {
-                "score": evaluation.tone_consistency.score,
-                "suggestions": evaluation.tone_consistency.suggestions
-            },
-            "originality": {
-                "score": evaluation.originality.score,
-                "suggestions": evaluation.originality.suggestions
-            },
-            "platform_fit": {
-                "score": evaluation.platform_fit.score,
-                "suggestions": evaluation.platform_fit.suggestions
+            aspect: {
+                "score": score.score,
+                "suggestions": score.suggestions
             }
+            for aspect in EVALUATION_ASPECTS
+            if (score := getattr(evaluation, aspect)) is not None
         }
-        
-        messages = [
-            {"role": "system", "content": "You are improving content based on specific evaluation feedback."},
-            {"role": "user", "content": f"""
-Original Content: {original_content.content}
-Tone: {original_content.tone}
-Content Type: {content_type.value}
-
-Evaluation Feedback:
-{json.dumps(eval_summary, indent=2)}
-
-Please rewrite the content addressing the evaluation feedback while maintaining the original intent and tone.
-"""}
-        ]
-        
-        result = await self.client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=messages,
-            response_format=ContentRewrite
+        return REWRITE_TEMPLATE.request(
+            content=original_content.content,
+            tone=original_content.tone,
+            content_type=content_type.value,
+            feedback=json.dumps(eval_summary, indent=2)
         )
-        
-        return result.choices[0].message.parsed
 
     def save_evaluation(self, evaluation: ContentEvaluation, content_id: str, content_type: ContentType):
         """Save evaluation results to a JSON file"""
         print(f"\n💾 Saving evaluation results...")
-        eval_path = self.eval_dir / content_type.value
-        eval_path.mkdir(exist_ok=True)
-        
-        filepath = eval_path / f"{content_id}_evaluation.json"
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(evaluation.model_dump(), f, indent=2)
+        filepath = evaluation_path(self.eval_dir.parent, content_type, content_id)
+        self.writer.write_text(filepath, render_evaluation(evaluation))
         print(f"✓ Evaluation saved to: {filepath}")
+
+    def save_rewrite(self, rewrite: ContentRewrite, content_id: str, content_type: ContentType):
+        filepath = rewrite_path(self.eval_dir.parent, content_type, content_id)
+        self.writer.write_text(filepath, render_rewrite(rewrite))
+        print(f"✓ Rewrite saved to: {filepath}")
+
+    def export_batch_requests(
+        self,
+        results: Iterable[StoredResult],
+        path: Union[str, Path],
+        aspects: Optional[list[str]] = None,
+        include_rewrites: bool = False,
+        max_requests_per_file: int = MAX_REQUESTS_PER_FILE
+    ) -> list[Path]:
+        """Write aspect evaluation requests for stored results as Batch API JSONL.
+
+        Each aspect uses the same request template as the live fanout path. With
+        `include_rewrites`, items whose saved evaluation fails a gating aspect also get a
+        rewrite request built from that evaluation. Returns the request files written.
+        """
+        aspects = aspects or EVALUATION_ASPECTS
+        seen: set[tuple] = set()
+        with BatchRequestFileWriter(path, max_requests_per_file) as requests:
+            for result in results:
+                # custom_ids must be unique within a file
+                if (result.content_type, result.content_id) in seen:
+                    continue
+                seen.add((result.content_type, result.content_id))
+                
+                agent = self.evaluation_agents[result.content_type]
+                for aspect in aspects:
+                    template = agent.templates[aspect]
+                    custom_id = evaluation_custom_id(result.content_type, result.content_id, aspect, template.version)
+                    requests.write(request_line(
+                        custom_id,
+                        template.request(content=result.content.content, intended_tone=result.tone)
+                    ))
+                if include_rewrites and result.evaluation is not None and failing_aspects(result.evaluation):
+                    custom_id = rewrite_custom_id(result.content_type, result.content_id, REWRITE_TEMPLATE.version)
+                    requests.write(request_line(
+                        custom_id,
+                        self._rewrite_request(result.content, result.evaluation, result.content_type)
+                    ))
+        print(f"✓ Exported {requests.requests} request(s) for {len(seen)} item(s)")
+        return requests.paths
+
+    def ingest_batch_results(self, path: Union[str, Path], save: bool = True, merge: bool = True) -> BatchIngestResult:
+        """Turn a Batch API results file back into evaluations (and rewrites) and save them.
+
+        Aspect scores are grouped by content_id. With `merge`, aspects missing from the
+        results are filled from the item's saved evaluation, so a subset of aspects can be
+        re-scored. Items still missing a gating aspect are reported in `errors`, as are
+        failed or unparseable result lines.
+        """
+        ingested = BatchIngestResult()
+        scores: dict[tuple, dict[str, EvaluationScore]] = defaultdict(dict)
+        versions: dict[tuple, dict[str, str]] = defaultdict(dict)
+        for record in iter_batch_results(path):
+            custom_id = record.get("custom_id", "")
+            try:
+                request = parse_custom_id(custom_id)
+                if request["kind"] == KIND_EVALUATE:
+                    item = (request["content_type"], request["content_id"])
+                    scores[item][request["aspect"]] = parse_result(record, EvaluationScore)
+                    versions[item][request["aspect"]] = request["version"]
+                else:
+                    rewrite = parse_result(record, ContentRewrite)
+                    ingested.rewrites[request["content_id"]] = rewrite
+                    if save:
+                        self.save_rewrite(rewrite, request["content_id"], request["content_type"])
+            except Exception as e:
+                ingested.errors[custom_id] = f"{type(e).__name__}: {e}"
+        
+        for (content_type, content_id), item_scores in scores.items():
+            item_versions = versions[(content_type, content_id)]
+            previous_file = evaluation_path(self.eval_dir.parent, content_type, content_id)
+            if merge and not all(aspect in item_scores for aspect in EVALUATION_ASPECTS) and previous_file.exists():
+                previous = ContentEvaluation.model_validate_json(previous_file.read_text(encoding="utf-8"))
+                for aspect in EVALUATION_ASPECTS:
+                    score = getattr(previous, aspect)
+                    if aspect not in item_scores and score is not None:
+                        item_scores[aspect] = score
+                        if previous.prompt_versions and aspect in previous.prompt_versions:
+                            item_versions[aspect] = previous.prompt_versions[aspect]
+            missing = [aspect for aspect in GATING_ASPECTS if aspect not in item_scores]
+            if missing:
+                ingested.errors[content_id] = f"No score for {', '.join(missing)}"
+                continue
+            evaluation = ContentEvaluation(
+                **item_scores,
+                timestamp=datetime.now().isoformat(),
+                prompt_versions=item_versions
+            )
+            ingested.evaluations[content_id] = evaluation
+            if save:
+                self.save_evaluation(evaluation, content_id, content_type)
+        return ingested
@@ -0,0 +1,289 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Union, Iterator
+import argparse
+import json
+import os
+import re
+import sqlite3
+
+from models_final import ContentType
+from artifact_formats_final import FILE_EXTENSIONS
+
+SCORE_COLUMNS = ["clarity", "engagement", "tone_consistency", "originality", "platform_fit"]
+
+KIND_CONTENT = "content"
+KIND_REWRITE = "rewrite"
+KIND_EVALUATION = "evaluation"
+
+_WHERE_PATTERN = re.compile(r"^\s*(\w+)\s*(<=|>=|<|>|=)\s*([\d.]+)\s*$")
+_SINCE_PATTERN = re.compile(r"^(\d+)([hdw])$")
+
+def _created_at(content_id: str, mtime: float) -> str:
+    # Content ids start with their creation timestamp; fall back to the file's mtime
+    try:
+        return datetime.strptime(content_id[:15], "%Y%m%d_%H%M%S").isoformat()
+    except ValueError:
+        return datetime.fromtimestamp(mtime).isoformat()
+
+def _read_header(path: Path) -> dict:
+    """Read the Topic/Tone header lines written in front of generated content"""
+    header = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip() == "---":
+                break
+            key, sep, value = line.partition(":")
+            if sep:
+                header[key.strip().lower()] = value.strip()
+    return header
+
+class ContentIndex:
+    """Incremental on-disk index over the generated_content/ file layout.
+
+    Each scan compares file mtime and size against the previous scan and only parses new
+    or changed content, rewrite and evaluation files, so re-indexing a large corpus is
+    cheap. The index holds content_id, type, tone, topic, per-aspect scores and whether
+    a rewrite exists.
+    """
+
+    def __init__(self, output_dir: Union[str, Path] = "generated_content", index_path: Optional[Union[str, Path]] = None):
+        self.output_dir = Path(output_dir)
+        self.path = Path(index_path) if index_path else self.output_dir / ".index.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    content_id TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS items (
+                    content_id TEXT PRIMARY KEY,
+                    content_type TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    topic TEXT,
+                    tone TEXT,
+                    {", ".join(f"{column} REAL" for column in SCORE_COLUMNS)},
+                    has_content INTEGER NOT NULL DEFAULT 0,
+                    has_rewrite INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_items_type_created ON items (content_type, created_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _scan_files(self) -> Iterator[tuple[str, str, str, ContentType, os.stat_result]]:
+        """Yield (path, kind, content_id, content_type, stat) for every artifact on disk"""
+        for content_type in ContentType:
+            extension = FILE_EXTENSIONS[content_type]
+            sources = [
+                (self.output_dir / content_type.value, KIND_CONTENT, extension),
+                (self.output_dir / content_type.value / "rewrites", KIND_REWRITE, f"_rewrite{extension}"),
+                (self.output_dir / "evaluations" / content_type.value, KIND_EVALUATION, "_evaluation.json")
+            ]
+            for directory, kind, suffix in sources:
+                if not directory.is_dir():
+                    continue
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(".") or not entry.name.endswith(suffix) or not entry.is_file():
+                            continue
+                        yield entry.path, kind, entry.name[:-len(suffix)], content_type, entry.stat()
+
+    def update(self) -> dict:
+        """Bring the index up to date, parsing only new or changed files"""
+        stats = {"scanned": 0, "updated": 0, "removed": 0}
+        with self._connect() as conn:
+            known = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in conn.execute("SELECT path, mtime_ns, size FROM files")
+            }
+            seen = set()
+            for path, kind, content_id, content_type, stat in self._scan_files():
+                stats["scanned"] += 1
+                seen.add(path)
+                if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                try:
+                    self._index_file(conn, Path(path), kind, content_id, content_type, stat)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠️ Skipping {path}: {type(e).__name__}: {e}")
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, kind, content_id, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+                    (path, kind, content_id, stat.st_mtime_ns, stat.st_size)
+                )
+                stats["updated"] += 1
+
+            for path in set(known) - seen:
+                kind, content_id = conn.execute("SELECT kind, content_id FROM files WHERE path = ?", (path,)).fetchone()
+                self._unindex_file(conn, kind, content_id)
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                stats["removed"] += 1
+        return stats
+
+    def _ensure_item(self, conn: sqlite3.Connection, content_id: str, content_type: ContentType, stat: os.stat_result):
+        conn.execute(
+            "INSERT INTO items (content_id, content_type, created_at) VALUES (?, ?, ?) ON CONFLICT (content_id) DO NOTHING",
+            (content_id, content_type.value, _created_at(content_id, stat.st_mtime))
+        )
+
+    def _index_file(self, conn: sqlite3.Connection, path: Path, kind: str, content_id: str, content_type: ContentType, stat: os.stat_result):
+        if kind == KIND_CONTENT:
+            header = _read_header(path)
+            self._ensure_item(conn, content_id, content_type, stat)
+            conn.execute(
+                "UPDATE items SET topic = ?, tone = ?, has_content = 1 WHERE content_id = ?",
+                (header.get("topic"), header.get("tone"), content_id)
+            )
+        elif kind == KIND_REWRITE:
+            self._ensure_item(conn, content_id, content_type, stat)
+            conn.execute("UPDATE items SET has_rewrite = 1 WHERE content_id = ?", (content_id,))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                evaluation = json.load(f)
+            scores = [(evaluation.get(column) or {}).get("score") for column in SCORE_COLUMNS]
+            self._ensure_item(conn, content_id, content_type, stat)
+            conn.execute(
+                f"UPDATE items SET {', '.join(f'{column} = ?' for column in SCORE_COLUMNS)} WHERE content_id = ?",
+                (*scores, content_id)
+            )
+
+    def _unindex_file(self, conn: sqlite3.Connection, kind: str, content_id: str):
+        if kind == KIND_CONTENT:
+            conn.execute("UPDATE items SET has_content = 0, topic = NULL, tone = NULL WHERE content_id = ?", (content_id,))
+        elif kind == KIND_REWRITE:
+            conn.execute("UPDATE items SET has_rewrite = 0 WHERE content_id = ?", (content_id,))
+        else:
+            conn.execute(f"UPDATE items SET {', '.join(f'{column} = NULL' for column in SCORE_COLUMNS)} WHERE content_id = ?", (content_id,))
+        # Drop the item once none of its files remain
+        conn.execute(
+            "DELETE FROM items WHERE content_id = ? AND NOT EXISTS (SELECT 1 FROM files WHERE content_id = ? AND kind != ?)",
+            (content_id, content_id, kind)
+        )
+
+    def query(
+        self,
+        content_type: Optional[ContentType] = None,
+        since: Optional[datetime] = None,
+        tone: Optional[str] = None,
+        topic_contains: Optional[str] = None,
+        conditions: Optional[list[tuple[str, str, float]]] = None,
+        has_rewrite: Optional[bool] = None,
+        limit: Optional[int] = None
+    ) -> list[dict]:
+        """Filter indexed items; `conditions` are (aspect, operator, value) score comparisons"""
+        where, params = [], []
+        if content_type is not None:
+            where.append("content_type = ?")
+            params.append(content_type.value)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since.isoformat())
+        if tone is not None:
+            where.append("tone = ? COLLATE NOCASE")
+            params.append(tone)
+        if topic_contains is not None:
+            where.append("topic LIKE ?")
+            params.append(f"%{topic_contains}%")
+        for aspect, operator, value in conditions or []:
+            if aspect not in SCORE_COLUMNS or operator not in ("<", "<=", ">", ">=", "="):
+                raise ValueError(f"Invalid condition: {aspect} {operator} {value}")
+            where.append(f"{aspect} {operator} ?")
+            params.append(value)
+        if has_rewrite is not None:
+            where.append("has_rewrite = ?")
+            params.append(int(has_rewrite))
+
+        sql = "SELECT * FROM items"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+def parse_condition(expression: str) -> tuple[str, str, float]:
+    """Parse a score filter such as `originality<5`"""
+    match = _WHERE_PATTERN.match(expression)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Expected <aspect><op><value>, e.g. originality<5, got: {expression}")
+    aspect, operator, value = match.groups()
+    if aspect not in SCORE_COLUMNS:
+        raise argparse.ArgumentTypeError(f"Unknown aspect '{aspect}', expected one of: {', '.join(SCORE_COLUMNS)}")
+    return aspect, operator, float(value)
+
+def parse_since(value: str) -> datetime:
+    """Parse a relative age (12h, 7d, 2w) or an ISO date"""
+    match = _SINCE_PATTERN.match(value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        return datetime.now() - {"h": timedelta(hours=amount), "d": timedelta(days=amount), "w": timedelta(weeks=amount)}[unit]
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected 12h/7d/2w or an ISO date, got: {value}")
+
+def _format_item(item: dict) -> str:
+    scores = " ".join(
+        f"{column}={item[column]:g}" if item[column] is not None else f"{column}=-"
+        for column in SCORE_COLUMNS
+    )
+    rewrite = " [rewrite]" if item["has_rewrite"] else ""
+    return f"{item['content_id']}  {item['content_type']}  tone={item['tone'] or '-'}  {scores}{rewrite}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index and query generated content")
+    parser.add_argument("--dir", default="generated_content", help="Output directory to index")
+    parser.add_argument("--index", help="Index file (default: <dir>/.index.sqlite)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("index", help="Update the index incrementally")
+
+    query_parser = subparsers.add_parser("query", help="Query the index (updates it first)")
+    query_parser.add_argument("--type", choices=[content_type.value for content_type in ContentType])
+    query_parser.add_argument("--since", type=parse_since, help="Only items newer than 12h/7d/2w or an ISO date")
+    query_parser.add_argument("--tone")
+    query_parser.add_argument("--topic", help="Substring of the topic")
+    query_parser.add_argument("--where", type=parse_condition, action="append", help="Score filter, e.g. 'originality<5' (repeatable)")
+    query_parser.add_argument("--rewritten", action="store_true", default=None, help="Only items with a rewrite")
+    query_parser.add_argument("--limit", type=int, default=50)
+    query_parser.add_argument("--no-update", action="store_true", help="Query without rescanning the files")
+    query_parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args()
+
+    index = ContentIndex(args.dir, args.index)
+    if args.command == "index" or not args.no_update:
+        stats = index.update()
+        if args.command == "index":
+            print(f"✓ Indexed {args.dir}: {stats['scanned']} files scanned, {stats['updated']} updated, {stats['removed']} removed")
+    if args.command == "query":
+        items = index.query(
+            content_type=ContentType(args.type) if args.type else None,
+            since=args.since,
+            tone=args.tone,
+            topic_contains=args.topic,
+            conditions=args.where,
+            has_rewrite=args.rewritten,
+            limit=args.limit
+        )
+        for item in items:
+            print(json.dumps(item) if args.json else _format_item(item))
+        if not args.json:
+            print(f"\n{len(items)} result(s)")
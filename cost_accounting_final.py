@@ -0,0 +1,232 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+import asyncio
+import threading
+
+from models_final import ContentType, TokenUsage, ContentUsage, BatchUsage
+
+# USD per one million tokens (input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00)
+}
+
+# Scheduling modes chosen by BatchBudget for the next job
+BUDGET_FULL = "full"
+BUDGET_DEGRADED = "degraded"
+BUDGET_EXHAUSTED = "exhausted"
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES[model]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+def _add(usage: TokenUsage, requests: int, prompt_tokens: int, completion_tokens: int, cost: float):
+    usage.requests += requests
+    usage.prompt_tokens += prompt_tokens
+    usage.completion_tokens += completion_tokens
+    usage.cost_usd += cost
+
+class UsageLedger:
+    """Telemetry sink that totals tokens and estimated cost per content piece, content type and batch.
+
+    Spans are attributed through their content_id, content_type and batch_id tags, so every
+    API call made inside a tagged pipeline run is counted without the stages reporting it.
+    Spans without token usage (saves, cache hits) are ignored.
+    """
+
+    def __init__(self, model: str = "gpt-4o"):
+        if model not in MODEL_PRICES:
+            raise ValueError(f"No price known for model: {model}")
+        self.model = model
+        self.total = TokenUsage()
+        self._contents: dict[str, dict[str, TokenUsage]] = defaultdict(lambda: defaultdict(TokenUsage))
+        self._content_types: dict[str, str] = {}
+        self._by_content_type: dict[str, TokenUsage] = defaultdict(TokenUsage)
+        self._batches: dict[str, TokenUsage] = defaultdict(TokenUsage)
+        self._batch_contents: dict[str, list[str]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        if not (record.get("requests") or record.get("prompt_tokens") or record.get("completion_tokens")):
+            return
+        prompt_tokens, completion_tokens = record["prompt_tokens"], record["completion_tokens"]
+        usage = (record["requests"], prompt_tokens, completion_tokens, estimate_cost(self.model, prompt_tokens, completion_tokens))
+        detail = record.get("aspect") or record.get("artifact")
+        stage = f"{record['stage']}.{detail}" if detail else record["stage"]
+        content_id, content_type, batch_id = record.get("content_id"), record.get("content_type"), record.get("batch_id")
+        with self._lock:
+            _add(self.total, *usage)
+            if content_type:
+                _add(self._by_content_type[content_type], *usage)
+            if content_id:
+                if content_id not in self._contents:
+                    self._content_types[content_id] = content_type
+                    if batch_id:
+                        self._batch_contents[batch_id].append(content_id)
+                _add(self._contents[content_id][stage], *usage)
+            if batch_id:
+                _add(self._batches[batch_id], *usage)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def spent(self, batch_id: Optional[str] = None) -> float:
+        """Estimated USD spent so far, in total or by one batch"""
+        with self._lock:
+            usage = self.total if batch_id is None else self._batches.get(batch_id)
+            return usage.cost_usd if usage is not None else 0.0
+
+    def content_cost(self, content_id: str) -> float:
+        with self._lock:
+            return sum(usage.cost_usd for usage in self._contents.get(content_id, {}).values())
+
+    def _content_total(self, content_id: str) -> TokenUsage:
+        total = TokenUsage()
+        for usage in self._contents.get(content_id, {}).values():
+            _add(total, usage.requests, usage.prompt_tokens, usage.completion_tokens, usage.cost_usd)
+        return total
+
+    def content_usage(self, content_id: str, content_type: ContentType) -> ContentUsage:
+        with self._lock:
+            stages = {stage: usage.model_copy() for stage, usage in self._contents.get(content_id, {}).items()}
+            total = self._content_total(content_id)
+        return ContentUsage(
+            content_id=content_id,
+            content_type=content_type,
+            model=self.model,
+            stages=stages,
+            total=total
+        )
+
+    def batch_usage(self, batch_id: str, budget: Optional["BatchBudget"] = None) -> BatchUsage:
+        with self._lock:
+            by_content = {content_id: self._content_total(content_id) for content_id in self._batch_contents.get(batch_id, [])}
+            by_content_type: dict[str, TokenUsage] = defaultdict(TokenUsage)
+            for content_id, usage in by_content.items():
+                _add(by_content_type[self._content_types[content_id]], usage.requests, usage.prompt_tokens, usage.completion_tokens, usage.cost_usd)
+            total = self._batches[batch_id].model_copy() if batch_id in self._batches else TokenUsage()
+        return BatchUsage(
+            batch_id=batch_id,
+            created_at=datetime.now().isoformat(),
+            model=self.model,
+            budget_usd=budget.limit_usd if budget is not None else None,
+            total=total,
+            by_content_type=dict(by_content_type),
+            by_content=by_content,
+            degraded_jobs=budget.degraded_jobs if budget is not None else 0,
+            skipped_jobs=budget.skipped_jobs if budget is not None else 0
+        )
+
+class BatchBudget:
+    """Chooses how much work the next batch job may do so the batch stays within a USD limit.
+
+    Every job in flight reserves what a job of its mode is expected to cost: the up-front
+    `estimated_job_usd` (or `estimated_degraded_job_usd` for the cheaper mode, gating aspects
+    only and no rewrite), scaled by how far the finished jobs of that mode, or of any mode
+    until one of that mode finishes, came in under or over their estimates. The projection is the cost of the finished jobs plus these reservations, or
+    what the batch has already spent if that is more. A job runs in full mode while the
+    projection is below `degrade_at` of the limit and a full job still fits, in the cheaper
+    mode while a cheaper job fits, and is skipped otherwise. A job held back only by what is
+    reserved for jobs in flight waits for one of them to finish instead.
+    """
+
+    def __init__(
+        self,
+        limit_usd: float,
+        ledger: UsageLedger,
+        batch_id: str,
+        degrade_at: float = 0.8,
+        estimated_job_usd: float = 0.0,
+        estimated_degraded_job_usd: float = 0.0
+    ):
+        if limit_usd <= 0:
+            raise ValueError("limit_usd must be positive")
+        if not 0 < degrade_at <= 1:
+            raise ValueError("degrade_at must be in (0, 1]")
+        if estimated_job_usd < 0 or estimated_degraded_job_usd < 0:
+            raise ValueError("job estimates must not be negative")
+        self.limit_usd = limit_usd
+        self.ledger = ledger
+        self.batch_id = batch_id
+        self.degrade_at = degrade_at
+        self.estimated_job_usd = estimated_job_usd
+        self.estimated_degraded_job_usd = estimated_degraded_job_usd
+        self.in_flight = 0
+        self.in_flight_degraded = 0
+        self.finished_jobs = 0
+        self.finished_cost = 0.0
+        self.finished_estimate = 0.0
+        # degraded → [cost, estimate] of the finished jobs of that mode
+        self._finished_by_mode = {False: [0.0, 0.0], True: [0.0, 0.0]}
+        self.degraded_jobs = 0
+        self.skipped_jobs = 0
+        self._released = asyncio.Condition()
+
+    def committed(self) -> float:
+        """What the finished jobs cost, or what the batch has already spent if that is more"""
+        return max(self.ledger.spent(self.batch_id), self.finished_cost)
+
+    def expected_job(self, degraded: bool = False) -> float:
+        """Expected cost of one more job in the given mode"""
+        estimate = self.estimated_degraded_job_usd if degraded else self.estimated_job_usd
+        mode_cost, mode_estimate = self._finished_by_mode[degraded]
+        if mode_estimate > 0:
+            return estimate * mode_cost / mode_estimate
+        if self.finished_estimate > 0:
+            return estimate * self.finished_cost / self.finished_estimate
+        if self.finished_jobs:
+            # Without estimates every job is expected to cost the average
+            return self.finished_cost / self.finished_jobs
+        return estimate
+
+    def projected(self) -> float:
+        reserved = (
+            (self.in_flight - self.in_flight_degraded) * self.expected_job()
+            + self.in_flight_degraded * self.expected_job(degraded=True)
+        )
+        return max(self.committed(), self.finished_cost + reserved)
+
+    def _choose(self) -> Optional[str]:
+        projected = self.projected()
+        if projected < self.degrade_at * self.limit_usd and projected + self.expected_job() <= self.limit_usd:
+            return BUDGET_FULL
+        if projected < self.limit_usd and projected + self.expected_job(degraded=True) <= self.limit_usd:
+            return BUDGET_DEGRADED
+        if self.in_flight and self.committed() + self.expected_job(degraded=True) <= self.limit_usd:
+            # Jobs in flight may come in under their reservations
+            return None
+        return BUDGET_EXHAUSTED
+
+    async def admit(self) -> str:
+        """Pick the mode for the next job; every admitted job must be released when it ends"""
+        async with self._released:
+            mode = self._choose()
+            while mode is None:
+                await self._released.wait()
+                mode = self._choose()
+            if mode == BUDGET_EXHAUSTED:
+                self.skipped_jobs += 1
+                return mode
+            self.in_flight += 1
+            if mode == BUDGET_DEGRADED:
+                self.in_flight_degraded += 1
+                self.degraded_jobs += 1
+            return mode
+
+    async def release(self, mode: str, job_cost: Optional[float] = None):
+        """End a job admitted in `mode`; failed jobs pass no cost and stay out of the expectations"""
+        degraded = mode == BUDGET_DEGRADED
+        async with self._released:
+            self.in_flight -= 1
+            self.in_flight_degraded -= degraded
+            if job_cost is not None:
+                estimate = self.estimated_degraded_job_usd if degraded else self.estimated_job_usd
+                self.finished_jobs += 1
+                self.finished_cost += job_cost
+                self.finished_estimate += estimate
+                self._finished_by_mode[degraded][0] += job_cost
+                self._finished_by_mode[degraded][1] += estimate
+            self._released.notify_all()
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Optional, Callable, Awaitable
+import asyncio
+import contextvars
+
+from models_final import ContentType, EvaluationScore
+from telemetry_final import Span, current_span, detached_span
+
+# Scores a list of contents for one (content type, aspect, intended tone), in order
+EvaluateMany = Callable[[ContentType, str, list[str], str, Optional[bool]], Awaitable[list[EvaluationScore]]]
+
+class _Pending:
+    __slots__ = ("content", "future", "span")
+
+    def __init__(self, content: str, future: asyncio.Future, span: Optional[Span]):
+        self.content = content
+        self.future = future
+        self.span = span
+
+class EvaluationBatcher:
+    """Coalesces concurrent single-aspect evaluations into one structured call per group.
+
+    Requests for the same content type, aspect, intended tone (for tone-dependent aspects)
+    and cache setting wait up to `window_s` for company, or until `max_batch` are pending,
+    and are then scored together. Identical contents in one group are scored once. The
+    shared call runs outside any caller's span; its tokens are split across the callers'
+    spans so per-item usage still adds up to what the API billed.
+    """
+
+    def __init__(
+        self,
+        evaluate_many: EvaluateMany,
+        window_s: float = 0.02,
+        max_batch: int = 8,
+        tone_dependent: frozenset = frozenset()
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.evaluate_many = evaluate_many
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.tone_dependent = tone_dependent
+        self._pending: dict[tuple, list[_Pending]] = defaultdict(list)
+        self._timers: dict[tuple, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "calls": 0}
+
+    async def evaluate(
+        self,
+        aspect: str,
+        content: str,
+        intended_tone: str,
+        content_type: ContentType,
+        use_cache: Optional[bool] = None
+    ) -> EvaluationScore:
+        tone = intended_tone if aspect in self.tone_dependent else ""
+        key = (content_type, aspect, tone, use_cache)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self._pending[key]
+        group.append(_Pending(content, future, current_span()))
+        self.stats["requests"] += 1
+
+        # Scheduled callbacks get an empty context so the shared call is not tagged as one caller's
+        if len(group) >= self.max_batch:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            loop.call_soon(self._flush, key, context=contextvars.Context())
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window_s, self._flush, key, context=contextvars.Context())
+        return await future
+
+    def _flush(self, key: tuple):
+        self._timers.pop(key, None)
+        group = self._pending.pop(key, None)
+        if not group:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(key, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: tuple, group: list[_Pending]):
+        content_type, aspect, tone, use_cache = key
+        waiting = [item for item in group if not item.future.done()]
+        contents = list(dict.fromkeys(item.content for item in waiting))
+        if not contents:
+            return
+        self.stats["calls"] += 1
+        try:
+            with detached_span() as shared:
+                scores = await self.evaluate_many(content_type, aspect, contents, tone, use_cache)
+        except Exception as e:
+            for item in waiting:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        by_content = dict(zip(contents, scores))
+        for index, item in enumerate(waiting):
+            if item.span is not None:
+                item.span.add_share(shared, index, len(waiting))
+            if not item.future.done():
+                item.future.set_result(by_content[item.content])
@@ -0,0 +1,254 @@
+from typing import Optional, TypeVar, TYPE_CHECKING
+from pydantic import BaseModel
+import asyncio
+import json
+import time
+
+from response_cache_final import ResponseCache
+from rate_limiter_final import RateLimiter, estimate_tokens, retry_after_seconds
+from concurrency_final import AdaptiveConcurrencyController
+from telemetry_final import Telemetry, current_span
+
+if TYPE_CHECKING:
+    # openai (and httpx) take most of the package's import time, so they load on first use
+    from openai import AsyncOpenAI
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+class LLMClient:
+    """Single pooled transport shared by every writing and evaluation agent.
+
+    All structured completions go through `parse`, so agents reuse warm keep-alive
+    connections instead of each holding its own AsyncOpenAI connection pool. When a
+    `ResponseCache` is attached, `structured` serves identical requests from it, and an
+    attached `RateLimiter` paces every request against RPM/TPM budgets and retries 429s.
+    An `AdaptiveConcurrencyController` caps how many requests are in flight at once.
+    Queue time, request time, retries and token usage are added to the open telemetry span.
+    """
+
+    def __init__(
+        self,
+        client: Optional["AsyncOpenAI"] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_by_default: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency: Optional[AdaptiveConcurrencyController] = None,
+        telemetry: Optional[Telemetry] = None
+    ):
+        self._openai = client
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        # Point at any OpenAI-compatible endpoint, e.g. the local stand-in used by the benchmarks
+        self.base_url = base_url
+        self.api_key = api_key
+        self.cache = cache
+        self.cache_by_default = cache_by_default
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.usage_totals = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        # Span sinks for every agent sharing this client; disabled until a sink is attached
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+
+    @property
+    def openai(self) -> "AsyncOpenAI":
+        """The underlying AsyncOpenAI client, created on first use"""
+        if self._openai is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
+            import httpx
+            
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                http2=self.http2  # requires the optional `h2` package (pip install httpx[http2])
+            )
+            # With a limiter attached, 429 retries are handled centrally instead of per request
+            self._openai = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                timeout=Timeout(self.timeout, connect=self.connect_timeout),
+                max_retries=0 if self.rate_limiter else 2
+            )
+        return self._openai
+
+    async def parse(self, *, model: str, messages: list[dict], response_format, **kwargs):
+        """Run a structured completion and return the full parsed completion"""
+        from openai import RateLimitError, APIConnectionError, InternalServerError
+        
+        limiter = self.rate_limiter
+        concurrency = self.concurrency
+        # Every one of `n` choices is billed as completion tokens
+        estimated = estimate_tokens(messages, (kwargs.get("max_tokens") or 400) * (kwargs.get("n") or 1))
+        span = current_span()
+        attempt = 0
+        while True:
+            queued = time.perf_counter()
+            if concurrency is not None:
+                await concurrency.acquire()
+            latency = None
+            overloaded = False
+            started = None
+            reserved = False
+            try:
+                if limiter is not None:
+                    await limiter.acquire(estimated)
+                    reserved = True
+                started = time.perf_counter()
+                completion = await self.openai.beta.chat.completions.parse(
+                    model=model,
+                    messages=messages,
+                    response_format=response_format,
+                    **kwargs
+                )
+                latency = time.perf_counter() - started
+                break
+            except RateLimitError as e:
+                overloaded = True
+                if limiter is None or attempt >= limiter.max_retries:
+                    raise
+                if span is not None:
+                    span.retries += 1
+                delay = limiter.backoff(attempt, retry_after_seconds(e))
+                print(f"⏳ Rate limited, retrying in {delay:.1f}s...")
+                attempt += 1
+            except (APIConnectionError, InternalServerError):
+                # Timeouts and 5xx are overload signals for the concurrency controller
+                overloaded = True
+                raise
+            finally:
+                if reserved and latency is None:
+                    # A failed or rejected request used no tokens; give the reservation back
+                    limiter.reconcile(estimated, 0)
+                if concurrency is not None:
+                    await concurrency.release(latency, overloaded)
+                if span is not None and started is not None:
+                    span.queued_s += started - queued
+                    span.in_flight_s += time.perf_counter() - started
+        
+        if span is not None:
+            span.add_usage(completion.usage)
+        self.usage_totals["requests"] += 1
+        if completion.usage is not None:
+            self.usage_totals["prompt_tokens"] += completion.usage.prompt_tokens
+            self.usage_totals["completion_tokens"] += completion.usage.completion_tokens
+        if limiter is not None:
+            limiter.reconcile(estimated, completion.usage.total_tokens if completion.usage else None)
+        return completion
+
+    async def structured(
+        self,
+        *,
+        model: str,
+        messages: list[dict],
+        response_format: type[ModelT],
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> ModelT:
+        """Run a structured completion and return only the parsed model.
+
+        `use_cache=None` follows `cache_by_default`; True/False force a cache lookup or a
+        bypass for this call. Bypassed calls neither read nor write the cache.
+        """
+        if use_cache is None:
+            use_cache = self.cache_by_default
+        cache = self.cache if use_cache else None
+        
+        key = None
+        if cache is not None:
+            key = cache.make_key(model, messages, response_format, **kwargs)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                span = current_span()
+                if span is not None:
+                    span.cache_hits += 1
+                return response_format.model_validate_json(cached)
+        
+        completion = await self.parse(model=model, messages=messages, response_format=response_format, **kwargs)
+        parsed = completion.choices[0].message.parsed
+        
+        if cache is not None and parsed is not None:
+            await asyncio.to_thread(cache.put, key, parsed.model_dump_json())
+        return parsed
+
+    async def structured_choices(
+        self,
+        *,
+        model: str,
+        messages: list[dict],
+        response_format: type[ModelT],
+        n: int,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> list[ModelT]:
+        """Ask for `n` completions in one request and return every parsed choice.
+
+        The prompt is sent and billed once. Choices the model refused are left out, so the
+        list can be shorter than `n`. Caching follows `structured`.
+        """
+        if use_cache is None:
+            use_cache = self.cache_by_default
+        cache = self.cache if use_cache else None
+        
+        key = None
+        if cache is not None:
+            key = cache.make_key(model, messages, response_format, n=n, **kwargs)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                span = current_span()
+                if span is not None:
+                    span.cache_hits += 1
+                return [response_format.model_validate(item) for item in json.loads(cached)]
+        
+        completion = await self.parse(model=model, messages=messages, response_format=response_format, n=n, **kwargs)
+        parsed = [choice.message.parsed for choice in completion.choices if choice.message.parsed is not None]
+        
+        if cache is not None and parsed:
+            await asyncio.to_thread(cache.put, key, json.dumps([item.model_dump(mode="json") for item in parsed]))
+        return parsed
+
+    async def warm_up(self, connections: int = 5):
+        """Open `connections` pooled connections up front so TLS handshakes are paid at startup"""
+        # The SDK loads its structured-output resources on first access, which takes longer than a request
+        self.openai.beta.chat.completions
+        results = await asyncio.gather(
+            *(self.openai.models.list() for _ in range(connections)),
+            return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            print(f"⚠️ Connection warm-up: {len(failures)}/{connections} requests failed ({failures[0]})")
+        else:
+            print(f"✓ Warmed up {connections} connections")
+
+    async def aclose(self):
+        if self._openai is not None:
+            await self._openai.close()
+
+_default_client: Optional[LLMClient] = None
+
+def get_default_client() -> LLMClient:
+    """Return the process-wide shared client, creating it on first use"""
+    global _default_client
+    if _default_client is None:
+        _default_client = LLMClient()
+    return _default_client
+
+def set_default_client(client: Optional[LLMClient]):
+    """Replace the process-wide shared client (None resets it)"""
+    global _default_client
+    _default_client = client
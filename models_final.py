@@ -1,7 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel as _PydanticBaseModel, ConfigDict
 from enum import Enum
 from typing import Optional, List
 
+class BaseModel(_PydanticBaseModel):
+    # Validators and schemas are built on first use rather than at import time
+    model_config = ConfigDict(defer_build=True)
+
 class ContentType(Enum):
     TWEET = "tweet"
     EMAIL = "email"
@@ -20,15 +24,125 @@ class EvaluationScore(BaseModel):
     suggestions: List[str]
 
 class ContentEvaluation(BaseModel):
+    # None when the draft broke a hard platform constraint and went straight to rewrite
+    clarity: Optional[EvaluationScore] = None
+    engagement: Optional[EvaluationScore] = None
+    tone_consistency: Optional[EvaluationScore] = None
+    # None while a gating-first evaluation is still completing these in the background
+    originality: Optional[EvaluationScore] = None
+    platform_fit: Optional[EvaluationScore] = None
+    timestamp: str
+    # Version of the request template each aspect was scored with, for auditing prompt changes
+    prompt_versions: Optional[dict[str, str]] = None
+
+class FusedEvaluation(BaseModel):
+    """All five aspect scores returned by a single structured call"""
     clarity: EvaluationScore
     engagement: EvaluationScore
     tone_consistency: EvaluationScore
     originality: EvaluationScore
     platform_fit: EvaluationScore
-    timestamp: str
+
+class CandidateScores(BaseModel):
+    """One aspect's scores for several candidates, in the order they were given"""
+    scores: List[EvaluationScore]
 
 class ContentRewrite(BaseModel):
     original_content: str
     improved_content: str
     changes_made: List[str]
     improvement_focus: List[str]
+
+class RewriteIteration(BaseModel):
+    iteration: int
+    improved_content: str
+    # Latest score of every scored aspect after this round, carried-over ones included
+    scores: dict[str, float]
+    reevaluated: List[str]
+    passed: bool
+    elapsed_s: float
+    # Repaired by the local platform-rule fix-up instead of an LLM rewrite
+    local: bool = False
+
+class RewriteHistory(BaseModel):
+    """Scores of each round of the rewrite loop, saved next to the evaluation"""
+    initial_scores: dict[str, float]
+    iterations: List[RewriteIteration]
+    converged: bool
+    stop_reason: str
+
+class ScoredCandidate(BaseModel):
+    content: WritingContent
+    evaluation: ContentEvaluation
+    weighted_score: float
+
+class CandidateSelection(BaseModel):
+    """Every best-of-N candidate with its scores, saved next to the chosen one's evaluation"""
+    weights: dict[str, float]
+    selected: int
+    candidates: List[ScoredCandidate]
+
+class TokenUsage(BaseModel):
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+class ContentUsage(BaseModel):
+    """Tokens and estimated cost of one content piece, split by pipeline stage"""
+    content_id: str
+    content_type: ContentType
+    model: str
+    stages: dict[str, TokenUsage]
+    total: TokenUsage
+
+class StoredResult(BaseModel):
+    content_id: str
+    content_type: ContentType
+    topic: str
+    tone: str
+    created_at: str
+    content: WritingContent
+    evaluation: Optional[ContentEvaluation] = None
+    rewrite: Optional[ContentRewrite] = None
+    rewrite_history: Optional[RewriteHistory] = None
+    usage: Optional[ContentUsage] = None
+
+class BatchUsage(BaseModel):
+    batch_id: str
+    created_at: str
+    model: str
+    budget_usd: Optional[float] = None
+    total: TokenUsage
+    by_content_type: dict[str, TokenUsage]
+    by_content: dict[str, TokenUsage]
+    degraded_jobs: int = 0
+    skipped_jobs: int = 0
+
+class BatchIngestResult(BaseModel):
+    """What an offline Batch API results file turned into, keyed by content_id"""
+    evaluations: dict[str, ContentEvaluation] = {}
+    rewrites: dict[str, ContentRewrite] = {}
+    # custom_id → why its result was not used
+    errors: dict[str, str] = {}
+
+class BatchJob(BaseModel):
+    topic: str
+    content_type: ContentType
+    tone: str = "professional"
+    additional_context: str = ""
+
+class BatchResult(BaseModel):
+    index: int
+    job: Optional[BatchJob] = None
+    content_id: Optional[str] = None
+    content: Optional[WritingContent] = None
+    evaluation: Optional[ContentEvaluation] = None
+    rewrite: Optional[ContentRewrite] = None
+    error: Optional[str] = None
+    # Run in the cheaper budget mode: gating aspects only, no rewrite
+    degraded: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,334 @@
+from typing import Optional
+import hashlib
+import re
+
+from models_final import ContentType, EvaluationScore
+
+# platform_fit score recorded for content that breaks a hard platform constraint; well
+# under REWRITE_THRESHOLD so it never reads as a pass
+HARD_FAILURE_SCORE = 2.0
+
+# Twitter counts every link as this many characters, whatever its length
+TWEET_URL_LENGTH = 23
+
+_URL = re.compile(r"https?://\S+")
+_HASHTAG = re.compile(r"(?<![\w#&])#\w+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SUBJECT_LINE = re.compile(r"^\s*subject\s*:\s*\S", re.IGNORECASE)
+# "SUBJECT - x", "**Subject line:** x" and other spellings normalized to "Subject: x"
+_SUBJECT_VARIANT = re.compile(r"^\s*[*_#]*\s*subject(?:\s+line)?\s*[*_]*\s*[:\-–—]\s*[*_]*\s*(.+?)\s*[*_]*\s*$", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*(?=\s|$)")
+_TRAILING_HASHTAGS = re.compile(r"(?:\s*(?<![\w#&])#\w+)+\s*$")
+_GREETING = re.compile(r"^\s*(hi|hello|hey|dear|greetings|good (morning|afternoon|evening))\b", re.IGNORECASE)
+_SIGN_OFF = re.compile(
+    r"^\s*(best|regards|kind regards|warm regards|best regards|sincerely|thanks|thank you|many thanks|cheers|warmly|all the best|talk soon)\b",
+    re.IGNORECASE
+)
+
+def hashtags(content: str) -> list[str]:
+    return _HASHTAG.findall(content)
+
+def paragraphs(content: str) -> list[str]:
+    return [paragraph for paragraph in _PARAGRAPH_BREAK.split(content.strip()) if paragraph.strip()]
+
+def _drop_hashtags(content: str, keep) -> str:
+    """Remove every hashtag for which `keep(tag, index)` is false, with the space before it"""
+    index = -1
+    def replace(match: re.Match) -> str:
+        nonlocal index
+        index += 1
+        return match.group(0) if keep(match.group(2), index) else ""
+    return re.sub(r"([ \t]*)((?<![\w#&])#\w+)", replace, content)
+
+def dedupe_hashtags(content: str) -> tuple[str, int]:
+    """Drop repeats of a hashtag (case-insensitive), keeping the first; returns the count removed"""
+    seen = set()
+    def keep(tag: str, index: int) -> bool:
+        if tag.lower() in seen:
+            return False
+        seen.add(tag.lower())
+        return True
+    fixed = _drop_hashtags(content, keep)
+    return fixed, len(hashtags(content)) - len(hashtags(fixed))
+
+def cap_hashtags(content: str, limit: int) -> tuple[str, int]:
+    """Keep the first `limit` hashtags; returns the count removed"""
+    fixed = _drop_hashtags(content, lambda tag, index: index < limit)
+    return fixed, len(hashtags(content)) - len(hashtags(fixed))
+
+def merge_paragraphs(content: str, limit: int) -> str:
+    """Join paragraphs past the first `limit - 1` into the last one"""
+    parts = paragraphs(content)
+    tail = " ".join(" ".join(part.split()) for part in parts[limit - 1:])
+    return "\n\n".join(parts[:limit - 1] + [tail])
+
+class RuleViolation:
+    """One broken rule; hard violations break a platform limit, soft ones are advice"""
+
+    __slots__ = ("rule", "message", "suggestion", "hard")
+
+    def __init__(self, rule: str, message: str, suggestion: str, hard: bool = True):
+        self.rule = rule
+        self.message = message
+        self.suggestion = suggestion
+        self.hard = hard
+
+    def __repr__(self) -> str:
+        return f"RuleViolation({self.rule!r}, hard={self.hard})"
+
+class PlatformCheck:
+    """What the local rules found in one piece of content"""
+
+    __slots__ = ("content_type", "violations", "version")
+
+    def __init__(self, content_type: ContentType, violations: list[RuleViolation], version: str):
+        self.content_type = content_type
+        self.violations = violations
+        self.version = version
+
+    @property
+    def hard_violations(self) -> list[RuleViolation]:
+        return [violation for violation in self.violations if violation.hard]
+
+    @property
+    def passed(self) -> bool:
+        return not self.hard_violations
+
+    def to_score(self) -> EvaluationScore:
+        """A failed check as a platform_fit score, in the shape the LLM evaluators return"""
+        return EvaluationScore(
+            reasoning="Breaks hard platform constraints: " + "; ".join(violation.message for violation in self.hard_violations),
+            score=HARD_FAILURE_SCORE,
+            suggestions=[violation.suggestion for violation in self.violations]
+        )
+
+class PlatformRules:
+    """Deterministic checks of one platform's mechanical limits.
+
+    Subclasses set the limits that apply and add platform-specific rules in `violations`.
+    `version` changes with the limits and `revision`, so evaluations record which rules
+    produced a platform_fit score.
+    """
+
+    # Bump when a rule's logic changes without a limit changing
+    revision = 1
+    max_characters: Optional[int] = None
+    recommended_characters: Optional[int] = None
+    max_hashtags: Optional[int] = None
+    recommended_hashtags: Optional[int] = None
+    max_paragraphs: Optional[int] = None
+
+    def __init__(self, content_type: ContentType):
+        self.content_type = content_type
+        limits = (
+            type(self).__name__, self.revision, self.max_characters, self.recommended_characters,
+            self.max_hashtags, self.recommended_hashtags, self.max_paragraphs
+        )
+        self.version = "rules-" + hashlib.sha256(repr(limits).encode()).hexdigest()[:12]
+
+    def length(self, content: str) -> int:
+        return len(content.strip())
+
+    def violations(self, content: str) -> list[RuleViolation]:
+        found = []
+        if not content.strip():
+            return [RuleViolation("empty", "the content is empty", "Write the content")]
+
+        length = self.length(content)
+        if self.max_characters is not None and length > self.max_characters:
+            found.append(RuleViolation(
+                "max_characters",
+                f"{length} characters, over the {self.max_characters}-character limit",
+                f"Cut the content to at most {self.max_characters} characters"
+            ))
+        elif self.recommended_characters is not None and length > self.recommended_characters:
+            found.append(RuleViolation(
+                "recommended_characters",
+                f"{length} characters, more than the recommended {self.recommended_characters}",
+                f"Aim for {self.recommended_characters} characters or fewer",
+                hard=False
+            ))
+
+        tags = hashtags(content)
+        if self.max_hashtags is not None and len(tags) > self.max_hashtags:
+            found.append(RuleViolation(
+                "max_hashtags",
+                f"{len(tags)} hashtags, over the limit of {self.max_hashtags}",
+                f"Keep at most {self.max_hashtags} hashtags"
+            ))
+        elif self.recommended_hashtags is not None and len(tags) > self.recommended_hashtags:
+            found.append(RuleViolation(
+                "recommended_hashtags",
+                f"{len(tags)} hashtags, more than the recommended {self.recommended_hashtags}",
+                f"Use {self.recommended_hashtags} or fewer focused hashtags",
+                hard=False
+            ))
+        if len({tag.lower() for tag in tags}) < len(tags):
+            found.append(RuleViolation(
+                "duplicate_hashtags",
+                "repeats a hashtag",
+                "Use each hashtag once",
+                hard=False
+            ))
+
+        if self.max_paragraphs is not None:
+            count = len(paragraphs(content))
+            if count > self.max_paragraphs:
+                found.append(RuleViolation(
+                    "max_paragraphs",
+                    f"{count} paragraphs, more than {self.max_paragraphs}",
+                    f"Condense the message into at most {self.max_paragraphs} short paragraph(s)"
+                ))
+        return found
+
+    def check(self, content: str) -> PlatformCheck:
+        return PlatformCheck(self.content_type, self.violations(content), self.version)
+
+    def fix(self, content: str) -> tuple[str, list[str]]:
+        """Repair mechanical violations without rewording: returns the content and the changes made.
+
+        Hashtags are de-duplicated and capped, surplus paragraphs merged and overlong content
+        cut at the last sentence that fits. What can't be repaired this way is left as is.
+        """
+        changes = []
+        content = content.strip()
+
+        content, removed = dedupe_hashtags(content)
+        if removed:
+            changes.append(f"Removed {removed} repeated hashtag(s)")
+        if self.max_hashtags is not None:
+            content, removed = cap_hashtags(content, self.max_hashtags)
+            if removed:
+                changes.append(f"Dropped {removed} hashtag(s) past the limit of {self.max_hashtags}")
+
+        if self.max_paragraphs is not None and len(paragraphs(content)) > self.max_paragraphs:
+            content = merge_paragraphs(content, self.max_paragraphs)
+            changes.append(f"Merged the message into {self.max_paragraphs} paragraph(s)")
+
+        if self.max_characters is not None and self.length(content) > self.max_characters:
+            content = self._shorten(content, changes)
+        return content, changes
+
+    def _shorten(self, content: str, changes: list[str]) -> str:
+        """Cut at the last sentence boundary that fits, keeping trailing hashtags if they still fit"""
+        before = self.length(content)
+        match = _TRAILING_HASHTAGS.search(content)
+        body, tail = (content[:match.start()], match.group(0).strip()) if match else (content, "")
+        if tail:
+            tail = ("\n\n" if "\n" in match.group(0)[:match.group(0).index("#")] else " ") + tail
+        for kept_tail in ([tail, ""] if tail else [""]):
+            ends = [match.end() for match in _SENTENCE_END.finditer(body)]
+            for end in reversed(ends):
+                shortened = body[:end].rstrip() + kept_tail
+                if self.length(shortened) <= self.max_characters:
+                    dropped = " and dropped the trailing hashtags" if tail and not kept_tail else ""
+                    changes.append(f"Cut from {before} to {self.length(shortened)} characters at a sentence boundary{dropped}")
+                    return shortened
+        # No sentence fits: cut at the last whole word and mark the cut
+        words = body.split(" ")
+        while len(words) > 1 and self.length(" ".join(words) + "…") > self.max_characters:
+            words.pop()
+        shortened = " ".join(words).rstrip(" ,;:-") + "…"
+        if self.length(shortened) > self.max_characters:
+            return content
+        changes.append(f"Cut from {before} to {self.length(shortened)} characters at a word boundary")
+        return shortened
+
+class TweetRules(PlatformRules):
+    max_characters = 280
+    recommended_hashtags = 3
+
+    def length(self, content: str) -> int:
+        # Links are shortened to a fixed length when posted
+        return len(_URL.sub("x" * TWEET_URL_LENGTH, content.strip()))
+
+class EmailRules(PlatformRules):
+    def violations(self, content: str) -> list[RuleViolation]:
+        found = super().violations(content)
+        lines = [line for line in content.strip().splitlines() if line.strip()]
+        if not lines:
+            return found
+
+        if not _SUBJECT_LINE.match(lines[0]):
+            found.append(RuleViolation(
+                "subject_line",
+                "no subject line",
+                "Start the email with a 'Subject:' line"
+            ))
+        body = lines[1:] if _SUBJECT_LINE.match(lines[0]) else lines
+        if body and not _GREETING.match(body[0]):
+            found.append(RuleViolation(
+                "greeting",
+                "no greeting",
+                "Open the body with a greeting such as 'Hi <name>,'",
+                hard=False
+            ))
+        if not any(_SIGN_OFF.match(line) for line in body[-3:]):
+            found.append(RuleViolation(
+                "sign_off",
+                "no sign-off",
+                "Close with a sign-off and signature such as 'Best regards,'",
+                hard=False
+            ))
+        return found
+
+    def fix(self, content: str) -> tuple[str, list[str]]:
+        """Normalize the email skeleton: a 'Subject:' line, a greeting and a sign-off.
+
+        A subject is only taken from a heading-like first line; an email with no such line
+        still needs a rewrite.
+        """
+        content, changes = super().fix(content)
+        first, _, body = content.partition("\n")
+        body = body.strip()
+
+        variant = _SUBJECT_VARIANT.match(first)
+        if variant and not first.startswith(f"Subject: {variant.group(1)}"):
+            first = f"Subject: {variant.group(1)}"
+            changes.append("Normalized the subject line")
+        elif not variant and body and len(first.split()) <= 12 and not _SENTENCE_END.search(first) and not _GREETING.match(first):
+            first = f"Subject: {first.strip(' *#_')}"
+            changes.append("Turned the heading line into the subject line")
+        if not _SUBJECT_LINE.match(first):
+            return content, changes
+
+        lines = [line for line in body.splitlines() if line.strip()]
+        if lines and not _GREETING.match(lines[0]):
+            body = f"Hello,\n\n{body}"
+            changes.append("Added a greeting")
+        if not any(_SIGN_OFF.match(line) for line in lines[-3:]):
+            body = f"{body}\n\nBest regards,"
+            changes.append("Added a sign-off")
+        return f"{first}\n\n{body}", changes
+
+class TextMessageRules(PlatformRules):
+    # Three SMS segments; longer messages are split or sent as MMS
+    max_characters = 480
+    recommended_characters = 160
+    max_paragraphs = 2
+    recommended_hashtags = 0
+
+class LinkedInRules(PlatformRules):
+    max_characters = 3000
+    recommended_hashtags = 5
+
+class InstagramRules(PlatformRules):
+    max_characters = 2200
+    max_hashtags = 30
+    recommended_hashtags = 10
+
+PLATFORM_RULE_CLASSES = {
+    ContentType.TWEET: TweetRules,
+    ContentType.EMAIL: EmailRules,
+    ContentType.TEXT_MESSAGE: TextMessageRules,
+    ContentType.LINKEDIN_POST: LinkedInRules,
+    ContentType.INSTAGRAM_CAPTION: InstagramRules
+}
+
+PLATFORM_RULES = {content_type: rules_class(content_type) for content_type, rules_class in PLATFORM_RULE_CLASSES.items()}
+
+def check_platform(content: str, content_type: ContentType) -> PlatformCheck:
+    return PLATFORM_RULES[content_type].check(content)
+
+def fix_platform(content: str, content_type: ContentType) -> tuple[str, list[str]]:
+    return PLATFORM_RULES[content_type].fix(content)
@@ -0,0 +1,306 @@
+from collections import defaultdict, Counter
+from pathlib import Path
+from typing import Optional, Union, Callable
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Leaf frames of a thread that is blocked rather than using CPU: the event loop waiting
+# in select() for network I/O or timers, and threads parked on a lock or queue
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker")
+}
+
+def _default_stage_functions() -> dict[Callable, str]:
+    from writing_agents_final import BaseWritingAgent, WritingAssistant
+    from content_evaluator_final import ContentEvaluator
+    from artifact_writer_final import ArtifactWriter
+    return {
+        BaseWritingAgent.generate_content: "generate",
+        BaseWritingAgent.generate_candidates: "generate",
+        ContentEvaluator._evaluate_aspect: "evaluate",
+        ContentEvaluator._evaluate_aspect_candidates: "evaluate",
+        ContentEvaluator._evaluate_content_fused: "evaluate.fused",
+        ContentEvaluator.check_constraints: "precheck",
+        ContentEvaluator.fix_up: "fixup",
+        ContentEvaluator.rewrite_content: "rewrite",
+        WritingAssistant._save_content: "save.content",
+        WritingAssistant._save_evaluation: "save.evaluation",
+        WritingAssistant._save_rewrite: "save.rewrite",
+        ArtifactWriter._run: "writer"
+    }
+
+class PipelineProfiler:
+    """Attribute client-side CPU time and memory to pipeline stages, apart from network wait.
+
+    A sampling thread reads every thread's stack every `interval` seconds. A sample whose
+    stack passes through a stage function (generate, evaluate, rewrite, save, the artifact
+    writer) counts as CPU for that stage, per aspect for evaluations. A thread idle in
+    select() or on a lock counts as waiting. Spans from `telemetry_final` supply wall,
+    queued and in-flight (network) time per stage, so the profiler doubles as a sink.
+    With `trace_allocations`, tracemalloc snapshots taken at start and stop give the memory
+    still allocated per stage and the top allocation sites. Tracing every allocation slows
+    the pipeline several times over, so take CPU figures from a run without it.
+
+    `write_folded` dumps the samples in the collapsed-stack format read by flamegraph.pl,
+    speedscope and inferno.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        trace_allocations: bool = False,
+        allocation_frames: int = 16,
+        stage_functions: Optional[dict[Callable, str]] = None
+    ):
+        self.interval = interval
+        self.trace_allocations = trace_allocations
+        self.allocation_frames = allocation_frames
+        self._stage_functions = stage_functions
+        self._stage_codes: dict = {}
+        self._aspect_codes: set = set()
+        self._stage_lines: dict[str, list[tuple[int, int, str]]] = defaultdict(list)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stacks: Counter = Counter()
+        self.cpu_samples: Counter = Counter()
+        self.idle_samples: Counter = Counter()
+        self.samples = 0
+        self.spans: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.wall_s = 0.0
+        self._started = 0.0
+        self._cpu_started = 0.0
+        self.process_cpu_s = 0.0
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._stop_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+        self._started_tracemalloc = False
+
+    def _build_stage_index(self):
+        functions = self._stage_functions or _default_stage_functions()
+        for function, stage in functions.items():
+            code = function.__code__
+            self._stage_codes[code] = stage
+            if stage == "evaluate":
+                self._aspect_codes.add(code)
+            lines = [line for _, _, line in code.co_lines() if line is not None]
+            self._stage_lines[code.co_filename].append((min(lines), max(lines), stage))
+
+    def start(self) -> "PipelineProfiler":
+        if self._thread is not None:
+            return self
+        self._build_stage_index()
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.allocation_frames)
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._start_snapshot = self._snapshot()
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._thread = threading.Thread(target=self._sample_loop, name="pipeline-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "PipelineProfiler":
+        if self._thread is None:
+            return self
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.wall_s = time.perf_counter() - self._started
+        self.process_cpu_s = time.process_time() - self._cpu_started
+        if self.trace_allocations:
+            self._stop_snapshot = self._snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        return self
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        # The profiler's own sample store is not part of the pipeline's footprint
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__)
+        ])
+
+    def __enter__(self) -> "PipelineProfiler":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._record(names.get(thread_id, str(thread_id)), frame)
+            self.samples += 1
+
+    def _record(self, thread_name: str, frame):
+        code = frame.f_code
+        idle = (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+        stage = None
+        codes = []
+        while frame is not None:
+            code = frame.f_code
+            codes.append(code)
+            if stage is None and code in self._stage_codes:
+                stage = self._stage_codes[code]
+                if code in self._aspect_codes:
+                    stage = f"evaluate.{frame.f_locals.get('aspect', '?')}"
+            frame = frame.f_back
+        self.stacks[(thread_name, tuple(codes))] += 1
+        if idle:
+            self.idle_samples[thread_name] += 1
+        else:
+            self.cpu_samples[stage or f"other ({thread_name})"] += 1
+
+    # Telemetry sink interface: per-stage wall, queue and network time from spans
+    def emit(self, record: dict):
+        detail = record.get("aspect") or record.get("artifact")
+        key = f"{record['stage']}.{detail}" if detail else record["stage"]
+        totals = self.spans[key]
+        totals["count"] += 1
+        for field in ("wall_s", "queued_s", "in_flight_s", "prompt_tokens", "completion_tokens"):
+            totals[field] += record.get(field, 0)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def _allocation_stage(self, traceback) -> str:
+        # Frames run oldest → newest; the innermost stage function wins
+        for frame in reversed(traceback):
+            for first, last, stage in self._stage_lines.get(frame.filename, ()):
+                if first <= frame.lineno <= last:
+                    return stage
+        return "other"
+
+    def allocations(self, top: int = 15) -> dict:
+        """Memory allocated since start and still live at stop, per stage and per source line"""
+        if self._start_snapshot is None or self._stop_snapshot is None:
+            return {}
+        per_stage: dict[str, dict[str, float]] = defaultdict(lambda: {"kib": 0.0, "blocks": 0})
+        for stat in self._stop_snapshot.compare_to(self._start_snapshot, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            totals = per_stage[self._allocation_stage(stat.traceback)]
+            totals["kib"] += stat.size_diff / 1024
+            totals["blocks"] += stat.count_diff
+        sites = [
+            {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "kib": stat.size_diff / 1024, "blocks": stat.count_diff}
+            for stat in self._stop_snapshot.compare_to(self._start_snapshot, "lineno")[:top]
+            if stat.size_diff > 0
+        ]
+        return {
+            "peak_kib": self.peak_bytes / 1024,
+            "per_stage": dict(sorted(per_stage.items(), key=lambda item: -item[1]["kib"])),
+            "top_sites": sites
+        }
+
+    def summary(self) -> dict:
+        stages = sorted(
+            set(self.spans) | {stage for stage in self.cpu_samples if not stage.startswith("other")},
+            key=lambda stage: -self.cpu_samples.get(stage, 0)
+        )
+        return {
+            "wall_s": self.wall_s,
+            "process_cpu_s": self.process_cpu_s,
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "stages": {
+                stage: {
+                    "cpu_s": self.cpu_samples.get(stage, 0) * self.interval,
+                    "spans": int(self.spans[stage]["count"]) if stage in self.spans else 0,
+                    "wall_s": self.spans[stage]["wall_s"] if stage in self.spans else None,
+                    "queued_s": self.spans[stage]["queued_s"] if stage in self.spans else None,
+                    "network_s": self.spans[stage]["in_flight_s"] if stage in self.spans else None
+                }
+                for stage in stages
+            },
+            "unattributed_cpu_s": {
+                stage: count * self.interval for stage, count in self.cpu_samples.items() if stage.startswith("other")
+            },
+            "idle_s": {thread: count * self.interval for thread, count in self.idle_samples.items()},
+            "allocations": self.allocations()
+        }
+
+    def report(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"⏱️ Profiled {summary['wall_s']:.2f}s wall, {summary['process_cpu_s']:.2f}s process CPU "
+            f"({summary['samples']} samples every {self.interval * 1000:g}ms)",
+            "",
+            f"{'stage':<28} {'cpu s':>8} {'spans':>6} {'wall s':>8} {'queued s':>9} {'network s':>10}"
+        ]
+        if self.trace_allocations:
+            lines.insert(1, "⚠️ Allocation tracing was on; CPU and wall times are inflated by tracemalloc")
+        fmt = lambda value: f"{value:.3f}" if value is not None else "-"
+        for stage, s in summary["stages"].items():
+            lines.append(
+                f"{stage:<28} {s['cpu_s']:>8.3f} {s['spans']:>6} {fmt(s['wall_s']):>8} {fmt(s['queued_s']):>9} {fmt(s['network_s']):>10}"
+            )
+        for stage, cpu in sorted(summary["unattributed_cpu_s"].items(), key=lambda item: -item[1]):
+            lines.append(f"{stage:<28} {cpu:>8.3f}")
+        if summary["idle_s"]:
+            lines.append("")
+            lines.append("Idle (waiting on network, timers or locks): " + ", ".join(
+                f"{thread} {seconds:.2f}s" for thread, seconds in sorted(summary["idle_s"].items(), key=lambda item: -item[1])
+            ))
+        allocations = summary["allocations"]
+        if allocations:
+            lines.append("")
+            lines.append(f"🧠 Peak traced memory {allocations['peak_kib']:.0f} KiB; still allocated at stop, per stage:")
+            for stage, totals in allocations["per_stage"].items():
+                lines.append(f"  {stage:<26} {totals['kib']:>9.1f} KiB {totals['blocks']:>8} blocks")
+            lines.append("Top allocation sites:")
+            for site in allocations["top_sites"]:
+                lines.append(f"  {site['kib']:>9.1f} KiB {site['blocks']:>8} blocks  {site['site']}")
+        return "\n".join(lines)
+
+    def write_folded(self, path: Union[str, Path], include_idle: bool = False) -> Path:
+        """Write the sampled stacks as `frame;frame;frame count` lines for flame graph tools"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        names = {}
+        folded: Counter = Counter()
+        for (thread_name, codes), count in self.stacks.items():
+            leaf = codes[0]
+            if not include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                continue
+            frames = [thread_name]
+            for code in reversed(codes):
+                if code not in names:
+                    names[code] = f"{os.path.basename(code.co_filename).removesuffix('.py')}:{code.co_name}"
+                frames.append(names[code])
+            folded[";".join(frames)] += count
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in folded.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def write_report(self, directory: Union[str, Path]) -> Path:
+        """Write report.txt, summary.json and stacks.folded into `directory`"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "report.txt").write_text(self.report() + "\n", encoding="utf-8")
+        (directory / "summary.json").write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        self.write_folded(directory / "stacks.folded")
+        return directory
@@ -0,0 +1,75 @@
+from typing import Optional, Any
+import hashlib
+import json
+
+_schema_cache: dict[type, dict] = {}
+_fingerprint_cache: dict[type, str] = {}
+
+def cached_json_schema(response_format: type) -> dict:
+    """JSON schema of a response model, derived once per class"""
+    schema = _schema_cache.get(response_format)
+    if schema is None:
+        schema = _schema_cache[response_format] = response_format.model_json_schema()
+    return schema
+
+def schema_fingerprint(response_format: type) -> str:
+    fingerprint = _fingerprint_cache.get(response_format)
+    if fingerprint is None:
+        payload = json.dumps(cached_json_schema(response_format), sort_keys=True)
+        fingerprint = _fingerprint_cache[response_format] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return fingerprint
+
+class RequestTemplate:
+    """Precompiled structured-completion request; only the per-call fields are filled in.
+
+    `version` hashes the model, system prompt, user template and response schema, so it
+    changes whenever any static part of the request does.
+    """
+
+    __slots__ = ("key", "model", "system_prompt", "user_template", "response_format", "_system_message", "_version")
+
+    def __init__(self, key: tuple, system_prompt: str, user_template: str, response_format: type, model: str = "gpt-4o"):
+        self.key = key
+        self.model = model
+        self.system_prompt = system_prompt
+        self.user_template = user_template
+        self.response_format = response_format
+        self._system_message = {"role": "system", "content": system_prompt}
+        self._version: Optional[str] = None
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            payload = json.dumps(
+                [self.model, self.system_prompt, self.user_template, self.response_format.__name__, schema_fingerprint(self.response_format)]
+            )
+            self._version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+        return self._version
+
+    def messages(self, **fields) -> list[dict]:
+        return [self._system_message, {"role": "user", "content": self.user_template.format(**fields)}]
+
+    def request(self, **fields) -> dict[str, Any]:
+        """Keyword arguments for LLMClient.structured/parse"""
+        return {"model": self.model, "messages": self.messages(**fields), "response_format": self.response_format}
+
+class PromptRegistry:
+    """Every compiled request template by key, for lookups and prompt-version audits"""
+
+    def __init__(self):
+        self._templates: dict[tuple, RequestTemplate] = {}
+
+    def register(self, template: RequestTemplate) -> RequestTemplate:
+        existing = self._templates.get(template.key)
+        if existing is not None and existing.system_prompt == template.system_prompt and existing.user_template == template.user_template:
+            return existing
+        self._templates[template.key] = template
+        return template
+
+    def get(self, key: tuple) -> Optional[RequestTemplate]:
+        return self._templates.get(key)
+
+    def versions(self) -> dict[str, str]:
+        return {"/".join(str(part) for part in key): template.version for key, template in self._templates.items()}
+
+PROMPT_REGISTRY = PromptRegistry()
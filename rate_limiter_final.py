@@ -0,0 +1,113 @@
+from typing import Optional
+import asyncio
+import random
+import time
+
+def estimate_tokens(messages: list[dict], completion_tokens: int = 400) -> int:
+    """Rough up-front token estimate (~4 characters per token) used to reserve TPM budget"""
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return prompt_chars // 4 + 4 * len(messages) + completion_tokens
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's retry hint from a 429 response, if it sent one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(float(value) * scale, 0.0)
+        except ValueError:
+            continue
+    return None
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most one minute of budget"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        # A single request larger than the whole bucket may go once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.available -= amount
+
+    def refund(self, amount: float):
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+class RateLimiter:
+    """Central requests-per-minute and tokens-per-minute limiter for every API call.
+
+    Callers `acquire` with an estimated token count before a request and `reconcile` with
+    the real usage afterwards. A 429 pauses all callers until the server's retry-after hint
+    (or an exponential backoff) has passed.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = 500,
+        tokens_per_minute: Optional[float] = 30_000,
+        max_retries: int = 6,
+        max_backoff: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.throttled = 0
+
+    async def acquire(self, estimated_tokens: int):
+        # The lock keeps waiters in FIFO order so large requests are not starved
+        async with self._lock:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if self.requests is not None:
+                    wait = max(wait, self.requests.wait_time(1))
+                if self.tokens is not None:
+                    wait = max(wait, self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests is not None:
+                self.requests.consume(1)
+            if self.tokens is not None:
+                self.tokens.consume(estimated_tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the TPM bucket once `completion.usage` reports the real token count"""
+        if self.tokens is None or actual_tokens is None:
+            return
+        difference = actual_tokens - estimated_tokens
+        if difference > 0:
+            self.tokens.consume(difference)
+        elif difference < 0:
+            self.tokens.refund(-difference)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Pause every caller after a 429 and return the delay that was applied"""
+        self.throttled += 1
+        if retry_after is None:
+            retry_after = min(self.max_backoff, 2 ** attempt) * (0.5 + random.random() / 2)
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        return retry_after
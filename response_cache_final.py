@@ -0,0 +1,135 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union, Iterator
+import hashlib
+import json
+import sqlite3
+import time
+
+from prompt_registry_final import cached_json_schema
+
+class ResponseCache:
+    """Persistent, content-addressed cache for structured completions.
+
+    Entries are keyed on a hash of the full request (model, messages, response schema and
+    extra parameters) and stored in SQLite, so several processes can share one cache file.
+    Eviction is LRU by last access, bounded by `max_entries` and `max_bytes`, with an
+    optional TTL.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = "generated_content/.cache/responses.sqlite",
+        max_entries: int = 50_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        evict_every: int = 100
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evict_every = evict_every
+        self._puts_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A fresh connection per operation keeps the cache safe to use from worker threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict], response_format, **params) -> str:
+        """Hash the full request so any change to prompt, schema or parameters misses"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "response_format": response_format.__name__,
+                "schema": cached_json_schema(response_format),
+                "params": params
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now)
+            )
+        self._puts_since_evict += 1
+        if self._puts_since_evict >= self.evict_every:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until within the size caps"""
+        self._puts_since_evict = 0
+        with self._connect() as conn:
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if total_bytes > self.max_bytes:
+                excess = total_bytes - self.max_bytes
+                freed = 0
+                stale_keys = []
+                for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                    stale_keys.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": total_bytes, "hits": self.hits, "misses": self.misses}
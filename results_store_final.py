@@ -0,0 +1,249 @@
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union, Iterator
+import argparse
+import sqlite3
+
+from models_final import ContentType, WritingContent, ContentEvaluation, ContentRewrite, RewriteHistory, ContentUsage, StoredResult
+from artifact_formats_final import (
+    content_path,
+    rewrite_path,
+    evaluation_path,
+    rewrite_history_path,
+    usage_path,
+    render_content,
+    render_rewrite,
+    render_evaluation,
+    render_rewrite_history,
+    render_usage
+)
+from artifact_writer_final import ArtifactWriter
+
+SCORE_COLUMNS = ["clarity", "engagement", "tone_consistency", "originality", "platform_fit"]
+
+class ResultsStore:
+    """SQLite store for generated content, evaluations, rewrites, rewrite histories and token usage, keyed by content_id.
+
+    An alternative to one file per artifact for large corpora. Content type, creation
+    time and every aspect score are indexed columns, so lookups by type, date and score
+    do not need to read the stored JSON. `export_files` recreates the file layout.
+    """
+
+    def __init__(self, path: Union[str, Path] = "generated_content/results.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contents (
+                    content_id TEXT PRIMARY KEY,
+                    content_type TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    tone TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS evaluations (
+                    content_id TEXT PRIMARY KEY,
+                    content_type TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    {", ".join(f"{column} REAL" for column in SCORE_COLUMNS)},
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rewrites (
+                    content_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rewrite_histories (
+                    content_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS usages (
+                    content_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contents_type_created ON contents (content_type, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contents_created ON contents (created_at)")
+            for column in SCORE_COLUMNS:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_evaluations_{column} ON evaluations (content_type, {column})")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save_content(self, content_id: str, content_type: ContentType, topic: str, content: WritingContent, created_at: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO contents (content_id, content_type, topic, tone, created_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (content_id, content_type.value, topic, content.tone, created_at or datetime.now().isoformat(), content.model_dump_json())
+            )
+
+    def save_evaluation(self, content_id: str, content_type: ContentType, evaluation: ContentEvaluation):
+        # Upsert, so a gating-first partial evaluation is replaced by the merged one
+        scores = [
+            score.score if (score := getattr(evaluation, column)) is not None else None
+            for column in SCORE_COLUMNS
+        ]
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO evaluations (content_id, content_type, timestamp, {', '.join(SCORE_COLUMNS)}, data) "
+                f"VALUES (?, ?, ?, {', '.join('?' for _ in SCORE_COLUMNS)}, ?)",
+                (content_id, content_type.value, evaluation.timestamp, *scores, evaluation.model_dump_json())
+            )
+
+    def save_rewrite(self, content_id: str, rewrite: ContentRewrite):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rewrites (content_id, data) VALUES (?, ?)",
+                (content_id, rewrite.model_dump_json())
+            )
+
+    def save_rewrite_history(self, content_id: str, history: RewriteHistory):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rewrite_histories (content_id, data) VALUES (?, ?)",
+                (content_id, history.model_dump_json())
+            )
+
+    def save_usage(self, content_id: str, usage: ContentUsage):
+        # Upsert, so usage saved before gating-first background scoring is replaced by the total
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO usages (content_id, data) VALUES (?, ?)",
+                (content_id, usage.model_dump_json())
+            )
+
+    def _row_to_result(self, row: tuple) -> StoredResult:
+        content_id, content_type, topic, tone, created_at, content_data, evaluation_data, rewrite_data, history_data, usage_data = row
+        return StoredResult(
+            content_id=content_id,
+            content_type=ContentType(content_type),
+            topic=topic,
+            tone=tone,
+            created_at=created_at,
+            content=WritingContent.model_validate_json(content_data),
+            evaluation=ContentEvaluation.model_validate_json(evaluation_data) if evaluation_data else None,
+            rewrite=ContentRewrite.model_validate_json(rewrite_data) if rewrite_data else None,
+            rewrite_history=RewriteHistory.model_validate_json(history_data) if history_data else None,
+            usage=ContentUsage.model_validate_json(usage_data) if usage_data else None
+        )
+
+    _SELECT = """
+        SELECT c.content_id, c.content_type, c.topic, c.tone, c.created_at, c.data, e.data, r.data, h.data, u.data
+        FROM contents c
+        LEFT JOIN evaluations e ON e.content_id = c.content_id
+        LEFT JOIN rewrites r ON r.content_id = c.content_id
+        LEFT JOIN rewrite_histories h ON h.content_id = c.content_id
+        LEFT JOIN usages u ON u.content_id = c.content_id
+    """
+
+    def get(self, content_id: str) -> Optional[StoredResult]:
+        with self._connect() as conn:
+            row = conn.execute(self._SELECT + " WHERE c.content_id = ?", (content_id,)).fetchone()
+        return self._row_to_result(row) if row else None
+
+    def query(
+        self,
+        content_type: Optional[ContentType] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_scores: Optional[dict[str, float]] = None,
+        max_scores: Optional[dict[str, float]] = None,
+        has_rewrite: Optional[bool] = None,
+        limit: Optional[int] = None
+    ) -> list[StoredResult]:
+        """Find stored results by type, creation date range and per-aspect score bounds"""
+        conditions, params = [], []
+        if content_type is not None:
+            conditions.append("c.content_type = ?")
+            params.append(content_type.value)
+        if since is not None:
+            conditions.append("c.created_at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            conditions.append("c.created_at < ?")
+            params.append(until.isoformat())
+        for bounds, operator in ((min_scores, ">="), (max_scores, "<")):
+            for aspect, value in (bounds or {}).items():
+                if aspect not in SCORE_COLUMNS:
+                    raise ValueError(f"Unknown aspect: {aspect}")
+                conditions.append(f"e.{aspect} {operator} ?")
+                params.append(value)
+        if has_rewrite is not None:
+            conditions.append("r.content_id IS NOT NULL" if has_rewrite else "r.content_id IS NULL")
+
+        sql = self._SELECT
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY c.created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._row_to_result(row) for row in rows]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0]
+
+    def iter_all(self, batch_size: int = 500) -> Iterator[StoredResult]:
+        last_id = ""
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    self._SELECT + " WHERE c.content_id > ? ORDER BY c.content_id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_result(row)
+            last_id = rows[-1][0]
+
+    def export_files(self, output_dir: Union[str, Path], content_type: Optional[ContentType] = None) -> int:
+        """Write stored records back out in the classic generated_content/ file layout"""
+        output_dir = Path(output_dir)
+        writer = ArtifactWriter()
+        exported = 0
+        for result in self.iter_all():
+            if content_type is not None and result.content_type != content_type:
+                continue
+            writer.write_text(content_path(output_dir, result.content_type, result.content_id), render_content(result.content, result.topic))
+            if result.evaluation is not None:
+                writer.write_text(evaluation_path(output_dir, result.content_type, result.content_id), render_evaluation(result.evaluation))
+            if result.rewrite is not None:
+                writer.write_text(rewrite_path(output_dir, result.content_type, result.content_id), render_rewrite(result.rewrite))
+            if result.rewrite_history is not None:
+                writer.write_text(rewrite_history_path(output_dir, result.content_type, result.content_id), render_rewrite_history(result.rewrite_history))
+            if result.usage is not None:
+                writer.write_text(usage_path(output_dir, result.content_type, result.content_id), render_usage(result.usage))
+            exported += 1
+        writer.close()
+        return exported
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a results store to the generated_content file layout")
+    parser.add_argument("--db", default="generated_content/results.sqlite", help="Path to the results store")
+    parser.add_argument("--out", default="generated_content", help="Directory to export files into")
+    parser.add_argument("--type", choices=[content_type.value for content_type in ContentType], help="Only export one content type")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    exported = store.export_files(args.out, ContentType(args.type) if args.type else None)
+    print(f"✓ Exported {exported} items to {args.out}")
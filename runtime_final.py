@@ -0,0 +1,92 @@
+from concurrent.futures import Future
+from typing import Optional, Coroutine, Any
+import asyncio
+import atexit
+import threading
+
+class BackgroundLoop:
+    """One event loop running in a daemon thread for the lifetime of the process.
+
+    Pooled connections, limiters and caches are bound to this loop, so they stay warm
+    across calls instead of being torn down by a fresh `asyncio.run` each time. Work can
+    be submitted from synchronous code (`run`) or awaited from another event loop (`arun`).
+    """
+
+    def __init__(self, name: str = "writing-assistant-loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "BackgroundLoop":
+        if self.running:
+            return self
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_forever, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run_forever(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule `coro` on the loop and return a concurrent.futures.Future"""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the loop and block the calling thread until it finishes"""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() cannot be called from the loop's own thread; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    async def arun(self, coro: Coroutine) -> Any:
+        """Await `coro` from another event loop while it runs on this one"""
+        if self.running and asyncio.get_running_loop() is self.loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self):
+        if not self.running:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if threading.current_thread() is self._thread:
+            return
+        self._thread.join()
+        self._thread = None
+        self.loop = None
+
+_default_runtime: Optional[BackgroundLoop] = None
+_default_runtime_lock = threading.Lock()
+
+def get_default_runtime() -> BackgroundLoop:
+    """Return the process-wide loop shared by every session, starting it on first use.
+
+    Clients outlive sessions (the default client is process-wide), and their pooled
+    connections stay bound to the loop that first used them, so sessions share one loop
+    rather than each stopping its own.
+    """
+    global _default_runtime
+    with _default_runtime_lock:
+        if _default_runtime is None:
+            _default_runtime = BackgroundLoop()
+            atexit.register(_default_runtime.stop)
+        return _default_runtime.start()
@@ -0,0 +1,293 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional, Union, Callable, Iterator
+import json
+import threading
+import time
+
+from artifact_writer_final import ArtifactWriter, atomic_write_text
+
+# Tags (content_id, content_type, aspect, ...) inherited by every span opened below them,
+# including spans in tasks created inside the tagged block
+_tags: ContextVar[dict] = ContextVar("telemetry_tags", default={})
+
+# Innermost open span; LLMClient adds queue time, request time, retries and tokens to it
+_current_span: ContextVar[Optional["Span"]] = ContextVar("telemetry_span", default=None)
+
+def current_tags() -> dict:
+    return _tags.get()
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+@contextmanager
+def tags(**values) -> Iterator[dict]:
+    """Attach tags to every span (and usage record) opened inside the block"""
+    token = _tags.set({**_tags.get(), **values})
+    try:
+        yield _tags.get()
+    finally:
+        _tags.reset(token)
+
+class Span:
+    """Timing and token usage of one pipeline stage, emitted to the sinks when it closes"""
+
+    __slots__ = (
+        "telemetry", "stage", "tags", "started_at", "_start", "_token",
+        "queued_s", "in_flight_s", "requests", "retries", "cache_hits",
+        "prompt_tokens", "completion_tokens"
+    )
+
+    def __init__(self, telemetry: "Telemetry", stage: str, tags: dict):
+        self.telemetry = telemetry
+        self.stage = stage
+        self.tags = tags
+        self.queued_s = 0.0
+        self.in_flight_s = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add_usage(self, usage):
+        self.requests += 1
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+
+    def add_share(self, other: "Span", index: int, count: int):
+        """Add part `index` of `count` of a shared call's usage; waiting times are added whole.
+
+        Counts are split into integers that sum back to the shared totals.
+        """
+        def part(total: int) -> int:
+            return total // count + (index < total % count)
+        self.queued_s += other.queued_s
+        self.in_flight_s += other.in_flight_s
+        self.requests += part(other.requests)
+        self.retries += part(other.retries)
+        self.prompt_tokens += part(other.prompt_tokens)
+        self.completion_tokens += part(other.completion_tokens)
+
+    def __enter__(self) -> "Span":
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        self.telemetry.emit({
+            "stage": self.stage,
+            **self.tags,
+            "started_at": self.started_at,
+            "wall_s": wall,
+            "queued_s": self.queued_s,
+            "in_flight_s": self.in_flight_s,
+            "requests": self.requests,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "error": f"{exc_type.__name__}: {exc}" if exc_type is not None else None
+        })
+        return False
+
+@contextmanager
+def detached_span() -> Iterator[Span]:
+    """Collect timing and usage of requests made inside the block without emitting a span.
+
+    Used for one call made on behalf of several pipeline items, whose usage is then split
+    across the items' own spans with `Span.add_share`.
+    """
+    span = Span(None, "detached", {})
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+class _NoopSpan:
+    """Returned while no sink is attached, so instrumented code pays one attribute check"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class Telemetry:
+    """Per-stage spans exported through pluggable sinks.
+
+    With no sinks attached `span()` returns a shared no-op context manager, so the
+    instrumentation left in the pipeline costs next to nothing when it is disabled.
+    """
+
+    def __init__(self, sinks: Optional[list] = None):
+        self.sinks = list(sinks or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def add_sink(self, sink) -> "Telemetry":
+        self.sinks.append(sink)
+        return self
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def span(self, stage: str, **span_tags):
+        if not self.sinks:
+            return _NOOP_SPAN
+        return Span(self, stage, {**_tags.get(), **span_tags})
+
+    def emit(self, record: dict):
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:
+                print(f"⚠️ Telemetry sink {type(sink).__name__} failed: {type(e).__name__}: {e}")
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+class CallbackSink:
+    """Hands every span record to an in-process callable"""
+
+    def __init__(self, callback: Callable[[dict], None]):
+        self.callback = callback
+
+    def emit(self, record: dict):
+        self.callback(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class JsonLinesSink:
+    """Appends one JSON object per span to a file; lines are buffered and written in blocks.
+
+    Full blocks are appended on the writer thread, so `emit` never touches the disk;
+    `flush` and `close` block until every line is written.
+    """
+
+    def __init__(self, path: Union[str, Path], buffer_size: int = 256, writer: Optional[ArtifactWriter] = None):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.writer = writer or ArtifactWriter()
+        self._owns_writer = writer is None
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        with self._lock:
+            self._buffer.append(json.dumps(record))
+            if len(self._buffer) < self.buffer_size:
+                return
+            lines, self._buffer = self._buffer, []
+        self.writer.submit(self._write, lines)
+
+    def _write(self, lines: list[str]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def flush(self):
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if lines:
+            self.writer.submit(self._write, lines)
+        self.writer.flush()
+
+    def close(self):
+        self.flush()
+        if self._owns_writer:
+            self.writer.close()
+
+class PrometheusTextSink:
+    """Aggregates spans into counters and rewrites a Prometheus text-format file.
+
+    Meant for the node_exporter textfile collector: series are labelled by stage,
+    content_type, aspect and artifact, and the file is replaced atomically at most every
+    `interval` seconds and on flush. `emit` only updates the counters; the file is
+    rendered and replaced on the writer thread.
+    """
+
+    LABELS = ("stage", "content_type", "aspect", "artifact")
+    COUNTERS = {
+        "spans": ("writing_assistant_spans_total", "Completed pipeline spans"),
+        "errors": ("writing_assistant_span_errors_total", "Spans that ended with an exception"),
+        "wall_s": ("writing_assistant_span_seconds_total", "Wall time spent in spans"),
+        "queued_s": ("writing_assistant_queued_seconds_total", "Time API requests waited for a concurrency slot or rate budget"),
+        "in_flight_s": ("writing_assistant_in_flight_seconds_total", "Time API requests were in flight"),
+        "requests": ("writing_assistant_requests_total", "API requests sent"),
+        "retries": ("writing_assistant_retries_total", "API requests retried after rate limiting"),
+        "cache_hits": ("writing_assistant_cache_hits_total", "Requests served from the response cache"),
+        "prompt_tokens": ("writing_assistant_prompt_tokens_total", "Prompt tokens used"),
+        "completion_tokens": ("writing_assistant_completion_tokens_total", "Completion tokens used")
+    }
+
+    def __init__(self, path: Union[str, Path], interval: float = 10.0, writer: Optional[ArtifactWriter] = None):
+        self.path = Path(path)
+        self.interval = interval
+        self.writer = writer or ArtifactWriter()
+        self._owns_writer = writer is None
+        self._series: dict[tuple, dict[str, float]] = defaultdict(lambda: dict.fromkeys(self.COUNTERS, 0.0))
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def emit(self, record: dict):
+        labels = tuple(str(record.get(label) or "") for label in self.LABELS)
+        with self._lock:
+            series = self._series[labels]
+            series["spans"] += 1
+            series["errors"] += record["error"] is not None
+            for key in self.COUNTERS:
+                if key in record:
+                    series[key] += record[key]
+        if time.monotonic() - self._last_write >= self.interval:
+            self._last_write = time.monotonic()
+            self.writer.submit(self._write)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            series = {labels: dict(values) for labels, values in self._series.items()}
+        for key, (name, help_text) in self.COUNTERS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, values in sorted(series.items()):
+                label_text = ",".join(f'{label}="{value}"' for label, value in zip(self.LABELS, labels) if value)
+                lines.append(f"{name}{{{label_text}}} {values[key]:g}")
+        return "\n".join(lines) + "\n"
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.path, self.render())
+
+    def flush(self):
+        # Queued behind earlier rewrites, so an older snapshot never replaces this one
+        self._last_write = time.monotonic()
+        self.writer.submit(self._write)
+        self.writer.flush()
+
+    def close(self):
+        self.flush()
+        if self._owns_writer:
+            self.writer.close()
@@ -0,0 +1,6 @@
+from benchmarks.startup_budget import measure, check, IMPORT_BUDGET_MS, CONSTRUCT_BUDGET_MS
+
+def test_startup_within_budget():
+    # Every run imports and constructs in a fresh interpreter, so earlier tests can't hide a regression
+    failures = check(measure(runs=3), IMPORT_BUDGET_MS, CONSTRUCT_BUDGET_MS)
+    assert not failures, "; ".join(failures)
@@ -1,7 +1,9 @@
-from openai import AsyncOpenAI
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union, Iterable, Iterator, AsyncIterator, Awaitable
+import argparse
+import csv
 import json
 import asyncio
 
@@ -9,36 +11,106 @@ from models_final import (
     ContentType, 
     WritingContent, 
     ContentEvaluation, 
-    ContentRewrite
+    ContentRewrite,
+    RewriteHistory,
+    ScoredCandidate,
+    CandidateSelection,
+    BatchJob,
+    BatchResult
+)
+from content_evaluator_final import (
+    ContentEvaluator,
+    LazyAgentMap,
+    EVALUATION_ASPECTS,
+    GATING_ASPECTS,
+    EVALUATION_MODE_FANOUT,
+    EVALUATION_MODES,
+    DEFAULT_SELECTION_WEIGHTS,
+    weighted_score,
+    unscored_aspects
+)
+from llm_client_final import LLMClient, get_default_client
+from response_cache_final import ResponseCache
+from rate_limiter_final import RateLimiter, estimate_tokens
+from concurrency_final import AdaptiveConcurrencyController
+from artifact_writer_final import ArtifactWriter, FSYNC_POLICIES, FSYNC_NEVER
+from results_store_final import ResultsStore
+from runtime_final import BackgroundLoop, get_default_runtime
+from prompt_registry_final import RequestTemplate, PROMPT_REGISTRY
+from telemetry_final import Telemetry, JsonLinesSink, PrometheusTextSink, tags
+from profiler_final import PipelineProfiler
+from cost_accounting_final import UsageLedger, BatchBudget, BUDGET_DEGRADED, BUDGET_EXHAUSTED, estimate_cost
+from artifact_formats_final import (
+    FILE_EXTENSIONS,
+    content_path,
+    rewrite_path,
+    usage_path,
+    rewrite_history_path,
+    candidates_path,
+    batch_usage_path,
+    render_content,
+    render_rewrite,
+    render_rewrite_history,
+    render_candidates,
+    render_usage
 )
-from content_evaluator_final import ContentEvaluator
 
 class BaseWritingAgent:
-    def __init__(self, content_type: ContentType):
-        self.client = AsyncOpenAI()
+    def __init__(self, content_type: ContentType, client: Optional[LLMClient] = None):
+        self.client = client or get_default_client()
         self.content_type = content_type
+        self._template: Optional[RequestTemplate] = None
         
     @property
     def system_prompt(self) -> str:
         raise NotImplementedError
         
-    def _build_prompt(self, topic: str, tone: str, additional_context: str = "") -> str:
-        prompt = f"Create content about: {topic}\nDesired tone: {tone}"
-        if additional_context:
-            prompt += f"\nAdditional context: {additional_context}"
-        prompt += "\n\nProvide the content in a clear, well-structured format appropriate for the platform."
-        return prompt
-
-    async def generate_content(self, topic: str, tone: str, additional_context: str = "") -> WritingContent:
-        result = await self.client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": self._build_prompt(topic, tone, additional_context)},
-            ],
-            response_format=WritingContent,
-        )
-        return result.choices[0].message.parsed
+    @property
+    def template(self) -> RequestTemplate:
+        """Generation request compiled once per agent; topic, tone and context are filled per call"""
+        if self._template is None:
+            self._template = PROMPT_REGISTRY.register(RequestTemplate(
+                (self.content_type.value, "generate"),
+                self.system_prompt,
+                "Create content about: {topic}\nDesired tone: {tone}{context}"
+                "\n\nProvide the content in a clear, well-structured format appropriate for the platform.",
+                WritingContent
+            ))
+        return self._template
+
+    async def generate_content(
+        self,
+        topic: str,
+        tone: str,
+        additional_context: str = "",
+        use_cache: Optional[bool] = None
+    ) -> WritingContent:
+        context = f"\nAdditional context: {additional_context}" if additional_context else ""
+        with self.client.telemetry.span("generate", content_type=self.content_type.value):
+            return await self.client.structured(
+                **self.template.request(topic=topic, tone=tone, context=context),
+                use_cache=use_cache,
+            )
+
+    async def generate_candidates(
+        self,
+        topic: str,
+        tone: str,
+        n: int,
+        additional_context: str = "",
+        use_cache: Optional[bool] = None
+    ) -> list[WritingContent]:
+        """Generate up to `n` alternative drafts with one request (the API's `n` parameter)"""
+        context = f"\nAdditional context: {additional_context}" if additional_context else ""
+        with self.client.telemetry.span("generate", content_type=self.content_type.value):
+            candidates = await self.client.structured_choices(
+                **self.template.request(topic=topic, tone=tone, context=context),
+                n=n,
+                use_cache=use_cache
+            )
+        if not candidates:
+            raise ValueError("The model returned no usable candidates")
+        return candidates
 
 class TweetAgent(BaseWritingAgent):
     @property
@@ -48,7 +120,7 @@ class TweetAgent(BaseWritingAgent):
 class EmailAgent(BaseWritingAgent):
     @property
     def system_prompt(self) -> str:
-        return "You are a professional email writer crafting clear, effective, and well-structured emails."
+        return "You are a professional email writer crafting clear, effective, and well-structured emails. Start every email with a 'Subject:' line."
 
 class TextMessageAgent(BaseWritingAgent):
     @property
@@ -65,66 +137,237 @@ class InstagramAgent(BaseWritingAgent):
     def system_prompt(self) -> str:
         return "You are crafting engaging and relevant Instagram captions that drive engagement and complement visual content."
 
+WRITING_AGENT_CLASSES = {
+    ContentType.TWEET: TweetAgent,
+    ContentType.EMAIL: EmailAgent,
+    ContentType.TEXT_MESSAGE: TextMessageAgent,
+    ContentType.LINKEDIN_POST: LinkedInAgent,
+    ContentType.INSTAGRAM_CAPTION: InstagramAgent
+}
+
+def iter_batch_records(path: Union[str, Path]) -> Iterator[Union[str, dict]]:
+    """Stream raw job records from a JSONL or CSV file without loading it all into memory.
+
+    JSONL lines are yielded unparsed, so a malformed line fails only its own job when the
+    job is run instead of ending the stream for every worker.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for row in csv.DictReader(f):
+                yield {key: value for key, value in row.items() if value not in (None, "")}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
 class WritingAssistant:
-    def __init__(self, output_dir: str = "generated_content"):
+    def __init__(
+        self,
+        output_dir: str = "generated_content",
+        client: Optional[LLMClient] = None,
+        evaluation_mode: Union[str, dict[ContentType, str]] = EVALUATION_MODE_FANOUT,
+        gating_first: bool = False,
+        writer: Optional[ArtifactWriter] = None,
+        store: Optional[ResultsStore] = None,
+        write_files: bool = True,
+        usage_ledger: Optional[UsageLedger] = None,
+        max_rewrite_iterations: int = 3,
+        rewrite_time_budget_s: Optional[float] = None,
+        candidates: int = 1,
+        selection_weights: Optional[dict[str, float]] = None,
+        micro_batch_size: int = 1,
+        micro_batch_window_s: float = 0.02,
+        precheck: bool = False
+    ):
+        # Output directories are created by the writer on the first save
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self._issued_ids: set[str] = set()
         
-        # Initialize specialized agents
-        self.agents = {
-            ContentType.TWEET: TweetAgent(ContentType.TWEET),
-            ContentType.EMAIL: EmailAgent(ContentType.EMAIL),
-            ContentType.TEXT_MESSAGE: TextMessageAgent(ContentType.TEXT_MESSAGE),
-            ContentType.LINKEDIN_POST: LinkedInAgent(ContentType.LINKEDIN_POST),
-            ContentType.INSTAGRAM_CAPTION: InstagramAgent(ContentType.INSTAGRAM_CAPTION)
-        }
+        # Decide on rewrites from the gating aspects alone and finish the rest in the background
+        self.gating_first = gating_first
+        self._background_tasks: set[asyncio.Task] = set()
+        self._pending_evaluations: dict[str, asyncio.Task] = {}
         
-        self.file_extensions = {
-            ContentType.EMAIL: ".eml",
-            ContentType.TWEET: ".txt",
-            ContentType.TEXT_MESSAGE: ".txt",
-            ContentType.LINKEDIN_POST: ".md",
-            ContentType.INSTAGRAM_CAPTION: ".txt"
-        }
+        # Rewrite until the gating aspects pass, within these limits
+        self.max_rewrite_iterations = max_rewrite_iterations
+        self.rewrite_time_budget_s = rewrite_time_budget_s
         
-        # Create content type directories
-        for content_type in ContentType:
-            (self.output_dir / content_type.value).mkdir(exist_ok=True)
+        # Best-of-N: drafts generated per request, and the aspect weights used to pick one
+        if candidates < 1:
+            raise ValueError("candidates must be at least 1")
+        unknown = set(selection_weights or {}) - set(EVALUATION_ASPECTS)
+        if unknown:
+            raise ValueError(f"Unknown aspect(s) in selection weights: {', '.join(sorted(unknown))}")
+        self.candidates = candidates
+        self.selection_weights = selection_weights or DEFAULT_SELECTION_WEIGHTS
+        
+        # Long-lived event loop behind the sync entry points, started on first use
+        self._runtime: Optional[BackgroundLoop] = None
+        
+        # One pooled client shared by every agent and the evaluator
+        self.client = client or get_default_client()
+        
+        # Specialized agents, built on first use per content type
+        self.agents = LazyAgentMap(
+            lambda content_type: WRITING_AGENT_CLASSES[content_type](content_type, self.client)
+        )
         
-        self.evaluator = ContentEvaluator(self.output_dir)
+        self.file_extensions = FILE_EXTENSIONS
+        
+        # Content, rewrites and evaluations are written by one background writer
+        self.writer = writer or ArtifactWriter()
+        
+        # Optional embedded store; per-artifact files can be turned off when it is used
+        if not write_files and store is None:
+            raise ValueError("write_files=False requires a store")
+        self.store = store
+        self.write_files = write_files
+        
+        self.evaluator = ContentEvaluator(
+            self.output_dir,
+            self.client,
+            evaluation_mode=evaluation_mode,
+            writer=self.writer,
+            micro_batch_size=micro_batch_size,
+            micro_batch_window_s=micro_batch_window_s,
+            precheck=precheck
+        )
+        
+        # Token and cost totals per content piece and batch, saved next to each evaluation
+        self.usage_ledger = None
+        if usage_ledger is not None:
+            self.track_usage(usage_ledger)
+
+    def track_usage(self, ledger: Optional[UsageLedger] = None) -> UsageLedger:
+        """Start recording tokens and estimated cost of every API call (idempotent)"""
+        if self.usage_ledger is None:
+            self.usage_ledger = ledger or UsageLedger()
+            self.client.telemetry.add_sink(self.usage_ledger)
+        return self.usage_ledger
+
+    async def warm_up(self, connections: int = 5):
+        """Pre-open pooled connections before the first generation request"""
+        await self.client.warm_up(connections)
+
+    def _run_in_background(self, coro: Awaitable) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def wait_for_background(self):
+        """Wait until every background evaluation has finished and been saved"""
+        while self._background_tasks:
+            await asyncio.gather(*list(self._background_tasks), return_exceptions=True)
+
+    async def _finish_evaluation(self, remaining: asyncio.Task, content_id: str, content_type: ContentType):
+        try:
+            evaluation = await remaining
+        except Exception as e:
+            print(f"⚠️ Non-gating evaluation for {content_id} failed: {type(e).__name__}: {e}")
+            return
+        # Overwrites the partial evaluation with the merged result
+        self._save_evaluation(evaluation, content_id, content_type)
+        self._save_usage(content_id, content_type)
+
+    async def flush(self):
+        """Wait for background evaluations, then for every queued file write and telemetry record"""
+        await self.wait_for_background()
+        await asyncio.to_thread(self.writer.flush)
+        if self.client.telemetry.enabled:
+            await asyncio.to_thread(self.client.telemetry.flush)
+
+    @property
+    def runtime(self) -> BackgroundLoop:
+        if self._runtime is None:
+            self._runtime = get_default_runtime()
+        return self._runtime.start()
+
+    def run(self, coro: Awaitable):
+        """Run a coroutine on the session loop and wait for it, keeping clients and limiters warm"""
+        return self.runtime.run(self._drain_after(coro))
+
+    def close(self):
+        """Flush pending work and stop the writer thread; the shared loop keeps running for later sessions"""
+        if self._runtime is not None and self._runtime.running:
+            self._runtime.run(self.flush())
+        self.writer.close()
+        self.client.telemetry.close()
+
+    @contextmanager
+    def profiling(self, **options) -> Iterator[PipelineProfiler]:
+        """Profile CPU, allocations and network wait per stage for everything run inside the block"""
+        profiler = PipelineProfiler(**options)
+        self.client.telemetry.add_sink(profiler)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            self.client.telemetry.remove_sink(profiler)
+
+    def __enter__(self) -> "WritingAssistant":
+        self.runtime
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def _drain_after(self, coro: Awaitable):
+        result = await coro
+        await self.flush()
+        return result
+
+    def _save_content(self, content: WritingContent, topic: str, content_type: ContentType, content_id: str):
+        with self.client.telemetry.span("save", artifact="content"):
+            if self.write_files:
+                self._save_to_file(content, topic, content_type, content_id)
+            if self.store is not None:
+                self.writer.submit(self.store.save_content, content_id, content_type, topic, content)
+
+    def _save_evaluation(self, evaluation: ContentEvaluation, content_id: str, content_type: ContentType):
+        with self.client.telemetry.span("save", artifact="evaluation"):
+            if self.write_files:
+                self.evaluator.save_evaluation(evaluation, content_id, content_type)
+            if self.store is not None:
+                self.writer.submit(self.store.save_evaluation, content_id, content_type, evaluation)
+
+    def _save_rewrite(self, rewrite: ContentRewrite, content_id: str, content_type: ContentType):
+        with self.client.telemetry.span("save", artifact="rewrite"):
+            if self.write_files:
+                self._save_rewrite_to_file(rewrite, content_id, content_type)
+            if self.store is not None:
+                self.writer.submit(self.store.save_rewrite, content_id, rewrite)
+
+    def _save_rewrite_history(self, history: RewriteHistory, content_id: str, content_type: ContentType):
+        if self.write_files:
+            filepath = rewrite_history_path(self.output_dir, content_type, content_id)
+            self.writer.write_text(filepath, render_rewrite_history(history))
+        if self.store is not None:
+            self.writer.submit(self.store.save_rewrite_history, content_id, history)
+
+    def _save_usage(self, content_id: str, content_type: ContentType):
+        if self.usage_ledger is None:
+            return
+        usage = self.usage_ledger.content_usage(content_id, content_type)
+        if self.write_files:
+            self.writer.write_text(usage_path(self.output_dir, content_type, content_id), render_usage(usage))
+        if self.store is not None:
+            self.writer.submit(self.store.save_usage, content_id, usage)
 
     def _save_to_file(self, content: WritingContent, topic: str, content_type: ContentType, content_id: str) -> str:
         """Save content to file using the provided content_id"""
-        filepath = self.output_dir / content_type.value / f"{content_id}{self.file_extensions[content_type]}"
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"Topic: {topic}\n")
-            f.write(f"Tone: {content.tone}\n")
-            if content.word_count:
-                f.write(f"Word count: {content.word_count}\n")
-            f.write("\n---\n\n")
-            f.write(content.content)
+        filepath = content_path(self.output_dir, content_type, content_id)
+        self.writer.write_text(filepath, render_content(content, topic))
         
         print(f"✓ Content saved to: {filepath}")
         return content_id
 
     def _save_rewrite_to_file(self, rewrite: ContentRewrite, original_id: str, content_type: ContentType):
-        rewrite_dir = self.output_dir / content_type.value / "rewrites"
-        rewrite_dir.mkdir(exist_ok=True)
-        
-        filepath = rewrite_dir / f"{original_id}_rewrite{self.file_extensions[content_type]}"
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write("=== Original Content ===\n\n")
-            f.write(rewrite.original_content)
-            f.write("\n\n=== Improved Content ===\n\n")
-            f.write(rewrite.improved_content)
-            f.write("\n\n=== Changes Made ===\n")
-            for change in rewrite.changes_made:
-                f.write(f"• {change}\n")
-            f.write("\n=== Improvement Focus ===\n")
-            for focus in rewrite.improvement_focus:
-                f.write(f"• {focus}\n")
+        filepath = rewrite_path(self.output_dir, content_type, original_id)
+        self.writer.write_text(filepath, render_rewrite(rewrite))
         
         print(f"✓ Rewrite saved to: {filepath}")
         return filepath
@@ -137,57 +380,341 @@ class WritingAssistant:
         additional_context: str = "",
         auto_rewrite: bool = True
     ) -> tuple[WritingContent, ContentEvaluation, Optional[ContentRewrite]]:
+        _, result, evaluation, rewrite = await self._run_pipeline(
+            topic, content_type, tone, additional_context, auto_rewrite
+        )
+        return result, evaluation, rewrite
+
+    async def _run_pipeline(
+        self,
+        topic: str,
+        content_type: ContentType,
+        tone: str,
+        additional_context: str,
+        auto_rewrite: bool,
+        degraded: bool = False
+    ) -> tuple[str, WritingContent, ContentEvaluation, Optional[ContentRewrite]]:
         print(f"\n🎯 Generating {content_type.value.replace('_', ' ')}...")
         print(f"• Topic: {topic}")
         print(f"• Tone: {tone}")
         if additional_context:
             print(f"• Additional context provided")
         
-        agent = self.agents[content_type]
-        result = await agent.generate_content(topic, tone, additional_context)
-        print("✓ Content generated successfully")
-        
-        # Generate content ID first so we can use it for both content and evaluation
+        # Generate content ID first so every stage below is tagged with it
         content_id = self._generate_content_id(topic)
-        
-        # Save original content
-        self._save_to_file(result, topic, content_type, content_id)
-        
-        # Evaluate content
-        evaluation = await self.evaluator.evaluate_content(
-            content=result.content,
-            intended_tone=tone,
-            content_type=content_type
-        )
-        
-        # Save evaluation
-        self.evaluator.save_evaluation(evaluation, content_id, content_type)
-        
-        rewrite = None
-        if auto_rewrite:
-            needs_rewrite = any(
-                getattr(evaluation, aspect).score < 8.0 
-                for aspect in ["clarity", "engagement", "tone_consistency"]
+        with tags(content_id=content_id, content_type=content_type.value):
+            result, evaluation, rewrite = await self._run_stages(
+                content_id, topic, content_type, tone, additional_context, auto_rewrite, degraded
             )
+        self._save_usage(content_id, content_type)
+        return content_id, result, evaluation, rewrite
+
+    async def _run_stages(
+        self,
+        content_id: str,
+        topic: str,
+        content_type: ContentType,
+        tone: str,
+        additional_context: str,
+        auto_rewrite: bool,
+        degraded: bool = False
+    ) -> tuple[WritingContent, ContentEvaluation, Optional[ContentRewrite]]:
+        rules_only = False
+        if self.candidates > 1 and not degraded:
+            result, evaluation = await self._run_best_of_n(content_id, topic, content_type, tone, additional_context)
+        else:
+            agent = self.agents[content_type]
+            result = await agent.generate_content(topic, tone, additional_context)
+            print("✓ Content generated successfully")
+            
+            # Save original content
+            self._save_content(result, topic, content_type, content_id)
             
-            if needs_rewrite:
-                print("\n🔄 Content scored below threshold, generating rewrite...")
-                rewrite = await self.evaluator.rewrite_content(
-                    result, evaluation, content_type
+            if degraded:
+                # Over the batch's soft budget: score only what decides a rewrite, and skip the rewrite
+                evaluation = await self.evaluator.evaluate_content(
+                    content=result.content,
+                    intended_tone=tone,
+                    content_type=content_type,
+                    aspects=GATING_ASPECTS
                 )
-                self._save_rewrite_to_file(rewrite, content_id, content_type)
+                self._save_evaluation(evaluation, content_id, content_type)
+                print("💸 Batch budget nearly spent, skipping non-gating aspects and rewrite")
+                return result, evaluation, None
+            
+            check = self.evaluator.check_constraints(result.content, content_type) if self.evaluator.precheck else None
+            rules_only = auto_rewrite and check is not None and not check.passed
+            if rules_only:
+                # Scores of a draft that is rewritten anyway are wasted; the rewrite loop scores the new draft
+                print(f"📏 Draft breaks hard platform constraints ({', '.join(violation.rule for violation in check.hard_violations)}), rewriting before evaluation")
+                evaluation = self.evaluator.rules_evaluation(check)
+                self._save_evaluation(evaluation, content_id, content_type)
+            elif self.gating_first and self.evaluator.evaluation_modes[content_type] == EVALUATION_MODE_FANOUT:
+                # Gating aspects decide right away; the rest are merged into the saved JSON later
+                evaluation, remaining = await self.evaluator.evaluate_gating_first(
+                    content=result.content,
+                    intended_tone=tone,
+                    content_type=content_type
+                )
+                self._save_evaluation(evaluation, content_id, content_type)
+                task = self._run_in_background(self._finish_evaluation(remaining, content_id, content_type))
+                self._pending_evaluations[content_id] = task
+                task.add_done_callback(lambda _: self._pending_evaluations.pop(content_id, None))
+            else:
+                # Evaluate content
+                evaluation = await self.evaluator.evaluate_content(
+                    content=result.content,
+                    intended_tone=tone,
+                    content_type=content_type
+                )
+            
+                # Save evaluation
+                self._save_evaluation(evaluation, content_id, content_type)
+        
+        rewrite = None
+        if auto_rewrite and self.evaluator.aspects_to_improve(result.content, content_type, evaluation):
+            print("\n🔄 Content scored below threshold, generating rewrite...")
+            rewrite, history, final_evaluation = await self.evaluator.improve_content(
+                result,
+                evaluation,
+                content_type,
+                tone,
+                max_iterations=self.max_rewrite_iterations,
+                time_budget_s=self.rewrite_time_budget_s
+            )
+            self._save_rewrite(rewrite, content_id, content_type)
+            self._save_rewrite_history(history, content_id, content_type)
+            if rules_only:
+                # The rules-only stub never stays the item's record: the loop scored only what it had
+                # to fix, so score the rest of the final draft like the regular path would
+                missing = unscored_aspects(final_evaluation)
+                if missing:
+                    final_evaluation = await self.evaluator.reevaluate_aspects(
+                        rewrite.improved_content, tone, content_type, final_evaluation, missing
+                    )
+                missing = unscored_aspects(final_evaluation)
+                if missing:
+                    raise ValueError(f"Evaluation of {content_id} is missing aspect(s): {', '.join(missing)}")
+                evaluation = final_evaluation
+                self._save_evaluation(evaluation, content_id, content_type)
         
         return result, evaluation, rewrite
 
+    async def _run_best_of_n(
+        self,
+        content_id: str,
+        topic: str,
+        content_type: ContentType,
+        tone: str,
+        additional_context: str
+    ) -> tuple[WritingContent, ContentEvaluation]:
+        """Generate several drafts in one request, score them together and keep the best"""
+        agent = self.agents[content_type]
+        candidates = await agent.generate_candidates(topic, tone, self.candidates, additional_context)
+        print(f"✓ {len(candidates)} candidates generated")
+        
+        evaluations = await self.evaluator.evaluate_candidates(
+            [candidate.content for candidate in candidates],
+            tone,
+            content_type
+        )
+        scored = [
+            ScoredCandidate(content=candidate, evaluation=evaluation, weighted_score=weighted_score(evaluation, self.selection_weights))
+            for candidate, evaluation in zip(candidates, evaluations)
+        ]
+        selected = max(range(len(scored)), key=lambda i: scored[i].weighted_score)
+        print(f"🏆 Picked candidate {selected + 1} of {len(scored)} (weighted score {scored[selected].weighted_score:.2f})")
+        
+        result, evaluation = candidates[selected], evaluations[selected]
+        self._save_content(result, topic, content_type, content_id)
+        self._save_evaluation(evaluation, content_id, content_type)
+        if self.write_files:
+            selection = CandidateSelection(weights=self.selection_weights, selected=selected, candidates=scored)
+            self.writer.write_text(candidates_path(self.output_dir, content_type, content_id), render_candidates(selection))
+        return result, evaluation
+
     def _generate_content_id(self, topic: str) -> str:
         """Generate a unique content ID based on timestamp and topic"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         sanitized_topic = "".join(c if c.isalnum() else "_" for c in topic)
-        return f"{timestamp}_{sanitized_topic[:30]}"
+        content_id = base_id = f"{timestamp}_{sanitized_topic[:30]}"
+        # Batch runs can produce the same topic within one second
+        suffix = 1
+        while content_id in self._issued_ids:
+            suffix += 1
+            content_id = f"{base_id}_{suffix}"
+        self._issued_ids.add(content_id)
+        return content_id
+
+    async def _run_batch_job(
+        self,
+        index: int,
+        job: Union[BatchJob, dict, str],
+        auto_rewrite: bool,
+        budget: Optional[BatchBudget] = None
+    ) -> BatchResult:
+        batch_job = None
+        degraded = False
+        try:
+            if isinstance(job, str):
+                job = json.loads(job)
+            batch_job = job if isinstance(job, BatchJob) else BatchJob.model_validate(job)
+            if budget is not None:
+                mode = await budget.admit()
+                if mode == BUDGET_EXHAUSTED:
+                    print(f"💸 Batch job {index} skipped: budget of ${budget.limit_usd:.2f} reached")
+                    return BatchResult(index=index, job=batch_job, error="Skipped: batch budget exhausted")
+                degraded = mode == BUDGET_DEGRADED
+            job_cost = None
+            try:
+                content_id, result, evaluation, rewrite = await self._run_pipeline(
+                    batch_job.topic,
+                    batch_job.content_type,
+                    batch_job.tone,
+                    batch_job.additional_context,
+                    auto_rewrite,
+                    degraded
+                )
+                if budget is not None:
+                    # Non-gating aspects still scoring in the background are part of this job's cost
+                    pending = self._pending_evaluations.get(content_id)
+                    if pending is not None:
+                        await asyncio.wait({pending})
+                    job_cost = self.usage_ledger.content_cost(content_id)
+            finally:
+                if budget is not None:
+                    await budget.release(mode, job_cost)
+        except Exception as e:
+            print(f"❌ Batch job {index} failed: {type(e).__name__}: {e}")
+            return BatchResult(index=index, job=batch_job, error=f"{type(e).__name__}: {e}", degraded=degraded)
+        return BatchResult(
+            index=index,
+            job=batch_job,
+            content_id=content_id,
+            content=result,
+            evaluation=evaluation,
+            rewrite=rewrite,
+            degraded=degraded
+        )
+
+    async def generate_batch(
+        self,
+        jobs: Union[str, Path, Iterable[Union[BatchJob, dict]]],
+        max_concurrency: int = 8,
+        auto_rewrite: bool = True,
+        budget_usd: Optional[float] = None,
+        degrade_at: float = 0.8
+    ) -> AsyncIterator[BatchResult]:
+        """Run the generate → evaluate → rewrite pipeline for many jobs, yielding results as they complete.
+
+        `jobs` is either an iterable of BatchJob/dict records or a path to a JSONL or CSV file.
+        At most `max_concurrency` jobs are in flight at once; a failing job is reported through
+        `BatchResult.error` instead of aborting the run.
+
+        With `budget_usd` the batch's estimated spend is tracked: past `degrade_at` of the
+        budget jobs skip the non-gating aspects and the rewrite, and once it is reached the
+        remaining jobs are skipped. With usage tracking on, the batch totals are saved under
+        `evaluations/batches/` when the batch finishes.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if isinstance(jobs, (str, Path)):
+            jobs = iter_batch_records(jobs)
+        
+        batch_id = self._generate_content_id("batch")
+        budget = None
+        if budget_usd is not None:
+            budget = BatchBudget(
+                budget_usd,
+                self.track_usage(),
+                batch_id,
+                degrade_at,
+                estimated_job_usd=self._estimate_job_cost(auto_rewrite),
+                estimated_degraded_job_usd=self._estimate_job_cost(auto_rewrite, degraded=True)
+            )
+        
+        job_iter = enumerate(jobs)
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+        
+        async def worker():
+            try:
+                # Workers share one iterator, so a large job file is read lazily
+                with tags(batch_id=batch_id):
+                    for index, job in job_iter:
+                        await results.put(await self._run_batch_job(index, job, auto_rewrite, budget))
+            except Exception as e:
+                # Reading the job source failed (e.g. malformed JSONL line)
+                await results.put(BatchResult(index=-1, error=f"{type(e).__name__}: {e}"))
+            finally:
+                await results.put(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = await results.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                yield item
+            await self.flush()
+            if self.usage_ledger is not None:
+                self._save_batch_usage(batch_id, budget)
+                await asyncio.to_thread(self.writer.flush)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def _estimate_job_cost(self, auto_rewrite: bool, degraded: bool = False) -> float:
+        """Pessimistic USD cost of one batch job, reserved for jobs in flight before any has finished.
+
+        Every request is priced as the longest generation prompt plus room for a draft, with the
+        rate limiter's default completion budget. A full job scores every aspect separately and,
+        with `auto_rewrite`, runs every rewrite round; a degraded one generates a single draft
+        and scores only the gating aspects.
+        """
+        completion_tokens = 400
+        prompt_tokens = max(
+            estimate_tokens(agent.template.messages(topic="", tone="", context=""), completion_tokens)
+            for agent in (self.agents[content_type] for content_type in ContentType)
+        )
+        if degraded:
+            requests = 1 + len(GATING_ASPECTS)
+        else:
+            requests = self.candidates * (1 + len(EVALUATION_ASPECTS))
+            if auto_rewrite:
+                requests += self.max_rewrite_iterations * (1 + len(EVALUATION_ASPECTS))
+        return requests * estimate_cost(self.usage_ledger.model, prompt_tokens, completion_tokens)
+
+    def _save_batch_usage(self, batch_id: str, budget: Optional[BatchBudget]):
+        usage = self.usage_ledger.batch_usage(batch_id, budget)
+        filepath = batch_usage_path(self.output_dir, batch_id)
+        self.writer.write_text(filepath, render_usage(usage))
+        print(
+            f"💰 Batch usage: {usage.total.requests} requests, {usage.total.prompt_tokens} prompt + "
+            f"{usage.total.completion_tokens} completion tokens, ~${usage.total.cost_usd:.4f}"
+        )
+        print(f"✓ Batch usage saved to: {filepath}")
+
+    async def _collect_batch(self, jobs, **kwargs) -> list[BatchResult]:
+        return [result async for result in self.generate_batch(jobs, **kwargs)]
+
+    def run_batch(self, jobs: Union[str, Path, Iterable[Union[BatchJob, dict]]], **kwargs) -> list[BatchResult]:
+        """Synchronous wrapper for generate_batch, returning results in completion order"""
+        return self.run(self._collect_batch(jobs, **kwargs))
 
     def generate_content(self, *args, **kwargs) -> tuple[WritingContent, ContentEvaluation, Optional[ContentRewrite]]:
         """Synchronous wrapper for generate_content_async"""
-        return asyncio.run(self.generate_content_async(*args, **kwargs))
+        return self.run(self.generate_content_async(*args, **kwargs))
+
+    async def agenerate_content(self, *args, **kwargs) -> tuple[WritingContent, ContentEvaluation, Optional[ContentRewrite]]:
+        """generate_content_async for callers on their own event loop; the work runs on the session loop"""
+        return await self.runtime.arun(self.generate_content_async(*args, **kwargs))
+
+    async def arun_batch(self, jobs: Union[str, Path, Iterable[Union[BatchJob, dict]]], **kwargs) -> list[BatchResult]:
+        """run_batch for callers on their own event loop"""
+        return await self.runtime.arun(self._collect_batch(jobs, **kwargs))
 
     async def interactive_generate_async(self):
         print("\n🤖 === Writing Assistant ===")
@@ -236,13 +763,18 @@ class WritingAssistant:
         print("-------------------")
         
         print("\n📊 === Content Evaluation ===")
-        for aspect, score in evaluation.model_dump().items():
-            if aspect != "timestamp":
+        for aspect in EVALUATION_ASPECTS:
+            score = getattr(evaluation, aspect)
+            if score is None and aspect in GATING_ASPECTS:
+                print(f"\n⏭️ {aspect.replace('_', ' ').title()}: not scored, the draft broke a hard platform constraint")
+            elif score is None:
+                print(f"\n⏳ {aspect.replace('_', ' ').title()}: still evaluating in the background")
+            else:
                 print(f"\n🎯 {aspect.replace('_', ' ').title()}:")
-                print(f"Reasoning: {score['reasoning']}")
-                print(f"Score: {score['score']}/10")
+                print(f"Reasoning: {score.reasoning}")
+                print(f"Score: {score.score}/10")
                 print("Suggestions:")
-                for suggestion in score['suggestions']:
+                for suggestion in score.suggestions:
                     print(f"• {suggestion}")
         
         if rewrite:
@@ -264,14 +796,126 @@ class WritingAssistant:
 
     def interactive_generate(self):
         """Synchronous wrapper for interactive_generate_async"""
-        return asyncio.run(self.interactive_generate_async())
+        return self.run(self.interactive_generate_async())
+
+def _parse_weights(value: str) -> dict[str, float]:
+    """Parse `aspect=weight,...`; aspects not listed get no weight"""
+    weights = {}
+    for part in value.split(","):
+        aspect, _, weight = part.partition("=")
+        if aspect.strip() not in EVALUATION_ASPECTS:
+            raise argparse.ArgumentTypeError(f"unknown aspect: {aspect.strip()}")
+        weights[aspect.strip()] = float(weight)
+    return weights
+
+async def _run_batch_cli(assistant: WritingAssistant, args: argparse.Namespace):
+    await assistant.warm_up(min(args.concurrency, 10))
+    succeeded = failed = degraded = 0
+    async for item in assistant.generate_batch(
+        args.batch,
+        max_concurrency=args.concurrency,
+        auto_rewrite=not args.no_rewrite,
+        budget_usd=args.budget,
+        degrade_at=args.degrade_at
+    ):
+        degraded += item.degraded
+        if item.ok:
+            succeeded += 1
+            print(f"✓ [{item.index}] {item.content_id}{' (degraded)' if item.degraded else ''}")
+        else:
+            failed += 1
+            print(f"❌ [{item.index}] {item.error}")
+    print(f"\n📦 Batch finished: {succeeded} succeeded, {failed} failed")
+    if degraded:
+        print(f"💸 {degraded} job(s) ran without non-gating aspects and rewrites to stay within budget")
+    if assistant.client.concurrency is not None:
+        print(f"📶 Adaptive concurrency: {assistant.client.concurrency.snapshot()}")
+    batcher = assistant.evaluator.batcher
+    if batcher is not None:
+        print(f"🧺 Micro-batching: {batcher.stats['requests']} aspect evaluations sent in {batcher.stats['calls']} calls")
 
 if __name__ == "__main__":
-    assistant = WritingAssistant()
+    parser = argparse.ArgumentParser(description="Writing Assistant")
+    parser.add_argument("--batch", help="JSONL or CSV file of jobs (topic, content_type, tone, additional_context)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum number of jobs in flight")
+    parser.add_argument("--no-rewrite", action="store_true", help="Skip automatic rewrites")
+    parser.add_argument("--cache", action="store_true", help="Serve repeated API requests from the on-disk response cache")
+    parser.add_argument("--evaluation-mode", choices=sorted(EVALUATION_MODES), default=EVALUATION_MODE_FANOUT,
+                        help="One API call per aspect (fanout) or all aspects in one call (fused)")
+    parser.add_argument("--rpm", type=float, help="Requests-per-minute budget for all API calls")
+    parser.add_argument("--tpm", type=float, help="Tokens-per-minute budget for all API calls")
+    parser.add_argument("--adaptive", action="store_true", help="Let in-flight API concurrency adapt to observed latency")
+    parser.add_argument("--fsync", choices=sorted(FSYNC_POLICIES), default=FSYNC_NEVER,
+                        help="When saved files are fsynced: never, once per write batch, or after every write")
+    parser.add_argument("--store", help="Also save results to this SQLite results store")
+    parser.add_argument("--no-files", action="store_true", help="With --store, skip the per-artifact files")
+    parser.add_argument("--gating-first", action="store_true",
+                        help="Decide rewrites from clarity, engagement and tone consistency alone; finish other aspects in the background")
+    parser.add_argument("--trace-jsonl", help="Append one JSON line per pipeline stage span to this file")
+    parser.add_argument("--metrics-file", help="Keep per-stage counters in this Prometheus text-format file")
+    parser.add_argument("--profile", help="Profile CPU and network wait per stage and write the report to this directory")
+    parser.add_argument("--profile-allocations", action="store_true",
+                        help="With --profile, also trace memory allocations per stage (much slower)")
+    parser.add_argument("--max-rewrites", type=int, default=3,
+                        help="Most rewrite rounds per item; each round re-scores only the still-failing gating aspects")
+    parser.add_argument("--rewrite-budget-s", type=float, help="Stop starting new rewrite rounds past this many seconds per item")
+    parser.add_argument("--candidates", type=int, default=1,
+                        help="Generate this many drafts in one request, score them together and keep the best")
+    parser.add_argument("--selection-weights", type=_parse_weights,
+                        help="With --candidates, aspect weights for picking the best draft, e.g. clarity=2,engagement=1.5")
+    parser.add_argument("--micro-batch", type=int, default=1,
+                        help="Score up to this many concurrent items per aspect and content type in one call")
+    parser.add_argument("--micro-batch-window-ms", type=float, default=20.0,
+                        help="With --micro-batch, how long a request waits for others to join its call")
+    parser.add_argument("--track-usage", action="store_true",
+                        help="Save prompt/completion tokens and estimated cost next to each evaluation")
+    parser.add_argument("--budget", type=float, help="With --batch, estimated USD limit for the whole batch (implies --track-usage)")
+    parser.add_argument("--degrade-at", type=float, default=0.8,
+                        help="Share of --budget after which jobs skip non-gating aspects and rewrites")
+    parser.add_argument("--precheck", action="store_true",
+                        help="Check hard platform limits locally first; drafts that break one go straight to rewrite")
+    args = parser.parse_args()
     
-    while True:
-        assistant.interactive_generate()
-        
-        if input("\nWould you like to generate more content? (y/n): ").lower() != 'y':
-            print("\nThank you for using Writing Assistant!")
-            break
+    client = None
+    if args.cache or args.rpm or args.tpm or args.adaptive or args.trace_jsonl or args.metrics_file:
+        telemetry = Telemetry()
+        if args.trace_jsonl:
+            telemetry.add_sink(JsonLinesSink(args.trace_jsonl))
+        if args.metrics_file:
+            telemetry.add_sink(PrometheusTextSink(args.metrics_file))
+        client = LLMClient(
+            cache=ResponseCache() if args.cache else None,
+            rate_limiter=RateLimiter(args.rpm, args.tpm) if (args.rpm or args.tpm) else None,
+            concurrency=AdaptiveConcurrencyController() if args.adaptive else None,
+            telemetry=telemetry
+        )
+    with WritingAssistant(
+        client=client,
+        evaluation_mode=args.evaluation_mode,
+        gating_first=args.gating_first,
+        writer=ArtifactWriter(fsync_policy=args.fsync),
+        store=ResultsStore(args.store) if args.store else None,
+        write_files=not (args.store and args.no_files),
+        usage_ledger=UsageLedger() if (args.track_usage or args.budget) else None,
+        max_rewrite_iterations=args.max_rewrites,
+        rewrite_time_budget_s=args.rewrite_budget_s,
+        candidates=args.candidates,
+        selection_weights=args.selection_weights,
+        micro_batch_size=args.micro_batch,
+        micro_batch_window_s=args.micro_batch_window_ms / 1000,
+        precheck=args.precheck
+    ) as assistant:
+        profiling = assistant.profiling(trace_allocations=args.profile_allocations) if args.profile else nullcontext()
+        with profiling as profiler:
+            if args.batch:
+                assistant.run(_run_batch_cli(assistant, args))
+            else:
+                while True:
+                    assistant.interactive_generate()
+                    
+                    if input("\nWould you like to generate more content? (y/n): ").lower() != 'y':
+                        print("\nThank you for using Writing Assistant!")
+                        break
+        if profiler is not None:
+            print(profiler.report())
+            print(f"\n🔥 Profile written to: {profiler.write_report(args.profile)}")